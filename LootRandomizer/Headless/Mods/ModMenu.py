@@ -0,0 +1,145 @@
+"""
+Stand-in for the SDK's ModMenu module. The game is selected via the
+LOOTRANDOMIZER_GAME environment variable ("bl2" or "tps").
+"""
+
+import enum, os
+
+from typing import Any, Callable, List, Sequence
+
+
+class Game(enum.Flag):
+    BL2 = enum.auto()
+    TPS = enum.auto()
+
+    @staticmethod
+    def GetCurrent() -> "Game":
+        if os.environ.get("LOOTRANDOMIZER_GAME", "bl2").lower() == "tps":
+            return Game.TPS
+        return Game.BL2
+
+
+class ModTypes(enum.Flag):
+    NONE = 0
+    Utility = enum.auto()
+    Content = enum.auto()
+    Gameplay = enum.auto()
+    Library = enum.auto()
+
+
+class EnabledSaveType(enum.Enum):
+    NotSaved = enum.auto()
+    LoadWithSettings = enum.auto()
+    LoadOnMainMenu = enum.auto()
+
+
+class SDKMod:
+    Name: str
+    IsEnabled: bool = False
+
+    def Enable(self) -> None:
+        self.IsEnabled = True
+
+    def Disable(self) -> None:
+        self.IsEnabled = False
+
+
+Mods: List[SDKMod] = []
+
+
+def RegisterMod(mod: SDKMod) -> None:
+    Mods.append(mod)
+
+
+def SaveModSettings(mod: SDKMod) -> None:
+    pass
+
+
+def ClientMethod(function: Callable[..., Any]) -> Callable[..., Any]:
+    return function
+
+
+def ServerMethod(function: Callable[..., Any]) -> Callable[..., Any]:
+    return function
+
+
+class Options:
+    class Base:
+        Caption: str
+        Description: str
+        IsHidden: bool
+
+    class Field(Base):
+        pass
+
+    class Nested(Field):
+        def __init__(
+            self,
+            Caption: str,
+            Description: str,
+            Children: Sequence["Options.Base"],
+            *,
+            IsHidden: bool = False,
+        ) -> None:
+            self.Caption = Caption
+            self.Description = Description
+            self.Children = Children
+            self.IsHidden = IsHidden
+
+    class Value(Base):
+        def __init__(
+            self,
+            Caption: str,
+            Description: str,
+            StartingValue: Any,
+            *,
+            IsHidden: bool = False,
+        ) -> None:
+            self.Caption = Caption
+            self.Description = Description
+            self.StartingValue = StartingValue
+            self.CurrentValue = StartingValue
+            self.IsHidden = IsHidden
+
+    class Hidden(Value):
+        def __init__(
+            self,
+            Caption: str,
+            Description: str = "",
+            StartingValue: Any = None,
+            *,
+            IsHidden: bool = True,
+        ) -> None:
+            super().__init__(
+                Caption, Description, StartingValue, IsHidden=IsHidden
+            )
+
+    class Boolean(Value):
+        def __init__(
+            self,
+            Caption: str,
+            Description: str,
+            StartingValue: bool,
+            Choices: Sequence[str] = ("Off", "On"),
+            *,
+            IsHidden: bool = False,
+        ) -> None:
+            self.Choices = Choices
+            super().__init__(
+                Caption, Description, StartingValue, IsHidden=IsHidden
+            )
+
+    class Spinner(Value):
+        def __init__(
+            self,
+            Caption: str,
+            Description: str,
+            StartingValue: str,
+            Choices: Sequence[str],
+            *,
+            IsHidden: bool = False,
+        ) -> None:
+            self.Choices = Choices
+            super().__init__(
+                Caption, Description, StartingValue, IsHidden=IsHidden
+            )
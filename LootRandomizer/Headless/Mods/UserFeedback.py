@@ -0,0 +1,9 @@
+from typing import Any
+
+
+class TextInputBox:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def Show(self) -> None:
+        pass
@@ -0,0 +1,9 @@
+"""
+Stand-in for the SDK's Mods package. Mods installed alongside Loot
+Randomizer (including Loot Randomizer itself) remain importable through it.
+"""
+
+import os
+
+_headless_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+__path__.append(os.path.dirname(os.path.dirname(_headless_dir)))  # type: ignore
@@ -0,0 +1,93 @@
+"""
+Stand-in for the unrealsdk module, for running Loot Randomizer's seed logic
+outside of the game. Every engine call returns an inert placeholder object.
+"""
+
+import sys
+
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Placeholder:
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Placeholder()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return _Placeholder()
+
+    def __getitem__(self, key: Any) -> Any:
+        return _Placeholder()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        pass
+
+    def __iter__(self) -> Any:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __int__(self) -> int:
+        return 0
+
+    def __str__(self) -> str:
+        return "0"
+
+    def __fspath__(self) -> str:
+        return "0"
+
+
+class UObject(_Placeholder):
+    @staticmethod
+    def PathName(obj: Any) -> str:
+        return str(obj)
+
+
+class UClass(_Placeholder):
+    pass
+
+
+class UFunction(_Placeholder):
+    pass
+
+
+class FStruct(_Placeholder):
+    pass
+
+
+Hooks: Dict[Tuple[str, str], Callable[..., bool]] = dict()
+
+
+def RunHook(function: str, name: str, hook: Callable[..., bool]) -> None:
+    Hooks[(function, name)] = hook
+
+
+def RemoveHook(function: str, name: str) -> None:
+    Hooks.pop((function, name), None)
+
+
+def Log(*args: Any) -> None:
+    print(*args, file=sys.stderr)
+
+
+def _placeholder(*args: Any, **kwargs: Any) -> Any:
+    return _Placeholder()
+
+
+ConstructObject = _placeholder
+FindObject = _placeholder
+FindAll = _placeholder
+GetEngine = _placeholder
+LoadPackage = _placeholder
+
+
+def KeepAlive(obj: Any) -> None:
+    pass
@@ -10,11 +10,12 @@ from unrealsdk import (
 )
 from unrealsdk import RunHook, RemoveHook, UObject, UFunction, FStruct
 
-import os
+import collections, os
 
 from typing import (
     Any,
     Callable,
+    Deque,
     Dict,
     Generator,
     Iterator,
@@ -197,35 +198,61 @@ def construct_object(
     return obj
 
 
-def do_next_tick(*routines: Callable[[], None]) -> None:
-    if not routines:
-        return
+class _TickScheduler:
+    """
+    Runs every routine scheduled for upcoming ticks from a single tick hook,
+    which is installed once and then left in place, rather than each routine
+    registering and removing a hook of its own. Each routine is paired with
+    whether it should keep being run for as long as it returns True.
 
-    def hook(caller: UObject, _f: UFunction, params: FStruct) -> bool:
-        RemoveHook("Engine.Interaction.Tick", f"LootRandomizer.{id(routines)}")
-        for routine in routines:
-            routine()
+    The hook is installed from the game thread when the mod is enabled.
+    Scheduling only appends to a deque, so routines may be scheduled from any
+    thread, and always run on the game thread.
+    """
+
+    hook_name: str = "LootRandomizer.TickScheduler"
+
+    _pending: Deque[Tuple[Callable[[], Any], bool]]
+
+    def __init__(self) -> None:
+        self._pending = collections.deque()
+
+    def install(self) -> None:
+        RunHook("Engine.Interaction.Tick", self.hook_name, self._tick)
+
+    def schedule(self, routine: Callable[[], Any], repeat: bool) -> None:
+        self._pending.append((routine, repeat))
+
+    def _tick(self, caller: UObject, _f: UFunction, params: FStruct) -> bool:
+        # Only run the routines already pending, leaving any scheduled by
+        # them for the following tick.
+        for _ in range(len(self._pending)):
+            routine, repeat = self._pending.popleft()
+            try:
+                if routine() and repeat:
+                    self._pending.append((routine, repeat))
+            except Exception as error:
+                Log(f"Failed to run scheduled routine {routine}: {error}")
         return True
 
-    RunHook("Engine.Interaction.Tick", f"LootRandomizer.{id(routines)}", hook)
 
+_scheduler = _TickScheduler()
 
-def tick_while(routine: Callable[[], bool]) -> None:
-    if not routine():
-        return
 
-    def hook(caller: UObject, _f: UFunction, params: FStruct) -> bool:
-        result = False
-        try:
-            result = routine()
-        finally:
-            if not result:
-                RemoveHook(
-                    "Engine.Interaction.Tick", f"LootRandomizer.{id(routine)}"
-                )
-            return True
+def Enable() -> None:
+    # The hook is left in place once disabled, so that routines scheduled
+    # while disabling still get to run.
+    _scheduler.install()
+
 
-    RunHook("Engine.Interaction.Tick", f"LootRandomizer.{id(routine)}", hook)
+def do_next_tick(*routines: Callable[[], None]) -> None:
+    for routine in routines:
+        _scheduler.schedule(routine, False)
+
+
+def tick_while(routine: Callable[[], bool]) -> None:
+    if routine():
+        _scheduler.schedule(routine, True)
 
 
 def spawn_loot(
@@ -1,77 +1,623 @@
-from . import options
-import json, sys, os, threading
+from __future__ import annotations
+
+from . import options, tracker
+from .defines import seeds_dir, do_next_tick
+import abc, json, sys, os, re, threading, hashlib, random, time
 import unrealsdk
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from typing import TYPE_CHECKING
+from types import ModuleType
+
+if TYPE_CHECKING:
+    import requests
+
+Files = Dict[str, str]
+
+lib_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib")
+
+
+def _ImportRequests() -> ModuleType:
+    """
+    Import the vendored HTTP stack. This is deferred until the uploader
+    thread performs its first upload, so that the game thread never pays for
+    it, nor does anyone not using the online tracker.
+    """
+    if lib_dir not in sys.path:
+        sys.path.append(lib_dir)
+    import requests
+
+    return requests
 
-import requests
 
 GithubGistApi = "https://api.github.com/gists"
-    
-def update(seed, content) -> None:
-    if options.GithubToken.CurrentValue == '':
+
+outbox_dir = os.path.join(seeds_dir, "Outbox")
+
+# Seconds to wait to connect, and then for each read of the response.
+Timeout = (5, 20)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _GetSession() -> requests.Session:
+    """
+    Return the long-lived session used for uploads, so that its connection to
+    the publishing backend is kept alive and reused between requests.
+    """
+    global _session
+    with _session_lock:
+        if not _session:
+            requests = _ImportRequests()
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=2
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def Close() -> None:
+    """Close the upload session along with its pooled connections."""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session:
+        session.close()
+
+
+class _Uploader:
+    """
+    Single long-lived worker performing all online tracker uploads, one at a
+    time. Only the latest files for each seed are kept while waiting to be
+    uploaded, so a burst of drops results in a single request with the
+    newest tracker, and older content can never be uploaded after newer.
+
+    Uploads are spaced out to fit within the rate limit reported by the API.
+    Throttled and failed uploads back off exponentially with jitter, then
+    retry with the newest content for their seed.
+
+    Files are only kept in the outbox once their upload has failed, or if
+    they are still waiting to be uploaded when the mod is disabled.
+    """
+
+    max_pending: int = 8
+
+    # Seconds between uploads when not limited by the rate limit.
+    min_interval: float = 1
+    # Seconds to back off after the first failure, and at most.
+    base_backoff: float = 2
+    max_backoff: float = 600
+
+    requests_sent: int = 0
+    failures: int = 0
+    remaining: Optional[int] = None
+    reset_time: Optional[float] = None
+    next_send_time: float = 0
+
+    _condition: threading.Condition
+    _pending: Dict[str, Files]
+    _current: Optional[Tuple[str, Files]]
+    _busy: bool
+    _thread: Optional[threading.Thread]
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._pending = dict()
+        self._current = None
+        self._busy = False
+        self._thread = None
+
+    def submit(self, seed: str, files: Files) -> List[str]:
+        """Queue the files for upload, returning any seeds dropped."""
+        dropped = []
+        with self._condition:
+            if not self._thread:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="LootRandomizer.Uploader",
+                    daemon=True,
+                )
+                self._thread.start()
+
+            # Re-insert the seed so that the queue stays ordered by the most
+            # recent update, then drop the stalest seeds past the bound.
+            self._pending.pop(seed, None)
+            self._pending[seed] = files
+            while len(self._pending) > self.max_pending:
+                dropped.append(next(iter(self._pending)))
+                del self._pending[dropped[-1]]
+
+            self._condition.notify_all()
+        return dropped
+
+    def flush(self) -> None:
+        with self._condition:
+            while self._pending or self._busy:
+                self._condition.wait()
+
+    def save_pending(self) -> None:
+        """Save every upload not yet completed to the outbox."""
+        with self._condition:
+            if self._current:
+                _SaveOutbox(*self._current)
+            for seed, files in self._pending.items():
+                _SaveOutbox(seed, files)
+
+    def _next(self) -> Tuple[str, Files]:
+        with self._condition:
+            while True:
+                if not self._pending:
+                    self._busy = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+                    continue
+
+                self._busy = True
+                delay = self.next_send_time - time.time()
+                if delay <= 0:
+                    break
+                self._condition.wait(delay)
+
+            seed = next(iter(self._pending))
+            self._current = seed, self._pending.pop(seed)
+            return self._current
+
+    def _schedule(self, response: Optional[requests.Response]) -> bool:
+        """
+        Update the rate limit state from the given response, or lack thereof
+        if the request failed, and schedule the next upload. Returns whether
+        the upload should be retried.
+        """
+        now = time.time()
+        retry_after: Optional[str] = None
+
+        if response is not None:
+            self.requests_sent += 1
+            retry_after = response.headers.get("Retry-After")
+            try:
+                self.remaining = int(response.headers["X-RateLimit-Remaining"])
+                self.reset_time = float(response.headers["X-RateLimit-Reset"])
+            except (KeyError, ValueError):
+                pass
+
+        # Github also responds 403 to requests it will never accept, such as
+        # with a token lacking the gist scope, which are not worth retrying.
+        throttled = response is not None and (
+            response.status_code == 429
+            or (
+                response.status_code == 403
+                and (
+                    retry_after is not None
+                    or response.headers.get("X-RateLimit-Remaining") == "0"
+                )
+            )
+        )
+
+        if response is None or throttled or response.status_code >= 500:
+            self.failures += 1
+            delay = min(
+                self.base_backoff * 2 ** (self.failures - 1), self.max_backoff
+            )
+            delay *= random.uniform(0.5, 1.5)
+
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            if self.remaining == 0 and self.reset_time:
+                delay = max(delay, self.reset_time - now)
+
+            self.next_send_time = now + delay
+            return True
+
+        self.failures = 0
+        delay = self.min_interval
+        if self.remaining is not None and self.reset_time:
+            # Spread the remaining requests over the rest of the window.
+            delay = max(delay, (self.reset_time - now) / (self.remaining + 1))
+
+        self.next_send_time = now + delay
+        return False
+
+    def _run(self) -> None:
+        while True:
+            seed, files = self._next()
+            response: Optional[requests.Response] = None
+            failed = False
+            try:
+                # The tick scheduler's hook, installed from the game thread,
+                # keeps the game calling into Python every tick, so that this
+                # thread gets to run while the request is in flight.
+                response = CurrentBackend().publish(seed, files)
+            except OSError as error:
+                # Including requests.RequestException, so that requests is
+                # only ever imported by backends that use the network.
+                unrealsdk.Log(f"Failed to update online tracker: {error}")
+                retry = self._schedule(None)
+            except Exception as error:
+                unrealsdk.Log(f"Failed to update online tracker: {error}")
+                retry = False
+                failed = True
+            else:
+                retry = response is not None and self._schedule(response)
+                failed = response is not None and not response.ok
+
+            with self._condition:
+                self._current = None
+                if seed in self._pending:
+                    # Newer content for the seed supersedes the retry.
+                    continue
+                if retry and len(self._pending) < self.max_pending:
+                    self._pending[seed] = files
+                    _SaveOutbox(seed, files)
+                elif retry or failed:
+                    # Not retried this session, so the outbox keeps the only
+                    # copy of the files until a later session uploads them.
+                    _SaveOutbox(seed, files)
+                else:
+                    _ClearOutbox(seed)
+
+
+_uploader = _Uploader()
+
+# The seeds with files in the outbox.
+_outboxed: Set[str] = set()
+
+
+def _OutboxPath(seed: str) -> str:
+    return os.path.join(outbox_dir, f"{seed}.json")
+
+
+def _SaveOutbox(seed: str, files: Files) -> None:
+    """
+    Keep the latest files for the seed in the outbox until they have been
+    uploaded. Outbox writes are performed by the tracker worker, coalesced
+    per seed, so the outbox always ends up with the latest operation.
+    """
+    _outboxed.add(seed)
+    path = _OutboxPath(seed)
+
+    def save() -> None:
+        os.makedirs(outbox_dir, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(files, file)
+        os.replace(temp_path, path)
+
+    tracker.Defer(path, save)
+
+
+def _ClearOutbox(seed: str) -> None:
+    if seed not in _outboxed:
         return
+    _outboxed.discard(seed)
+    path = _OutboxPath(seed)
 
-    def executeRequest():
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {options.GithubToken.CurrentValue}",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+    def clear() -> None:
+        if os.path.exists(path):
+            os.remove(path)
 
-        if options.LastSeed.CurrentValue == seed:
-            data = {
-                "description": f"Tracker for {seed}",
-                "files": {
-                    f"{seed}": {
-                        "content": f"{content}"
-                    }
-                }
-            }
-        elif len(options.LastSeed.CurrentValue) > 0 and len(options.GistId.CurrentValue) > 0:
-            data = {
-                "description": f"Tracker for {seed}",
-                "files": {
-                    f"{seed}": {
-                        "content": f"{content}"
-                    },
-                    f"{options.LastSeed.CurrentValue}": {
-                        "content": ""
-                    }
-                }
-            }
-        else:
-            data = {
-                "description": f"Tracker for {seed}",
-                "public": True,
-                "files": {
-                    f"{seed}": {
-                        "content": f"{content}"
-                    }
-                }
-            }
-
-        if len(options.GistId.CurrentValue) == 0:
-            method = "POST"
-            url = GithubGistApi
+    tracker.Defer(path, clear)
+
+
+def SaveOutbox() -> None:
+    """Keep the uploads still pending in the outbox for the next session."""
+    _uploader.save_pending()
+
+
+def DrainOutbox() -> None:
+    """Queue the uploads left in the outbox by a previous session."""
+    if not (
+        options.OnlineTracker.CurrentValue
+        and CurrentBackend().configured()
+        and os.path.isdir(outbox_dir)
+    ):
+        return
+
+    tracker.Flush()
+
+    entries = []
+    for file_name in os.listdir(outbox_dir):
+        path = os.path.join(outbox_dir, file_name)
+        if file_name.endswith(".json"):
+            entries.append((os.path.getmtime(path), file_name[:-5], path))
         else:
-            method = "PATCH"
-            url = f"{GithubGistApi}/{options.GistId.CurrentValue}"
-
-        dataString = json.dumps(data, indent=4)
-        response = requests.request(method, url, headers=headers, data=dataString)
-        options.LastSeed.CurrentValue = seed
-        options.SaveSettings()
-    
-        if response.status_code == 201:
-            gist = json.loads(response.content)
-            options.GistId.CurrentValue = gist["id"]
-            options.GistUrl.CurrentValue = gist["html_url"]
-            options.SaveSettings()
-        unrealsdk.RemoveHook("Engine.PlayerController.PlayerTick", "ModMenu.NetworkManager")
-        
-    threading.Thread(target=executeRequest).start()
-    unrealsdk.RunHook("Engine.PlayerController.PlayerTick", "ModMenu.NetworkManager", _PlayerTick)
-
-def _PlayerTick(caller: unrealsdk.UObject, function: unrealsdk.UFunction, params: unrealsdk.FStruct) -> bool:
-    return True
\ No newline at end of file
+            os.remove(path)
+
+    entries.sort()
+    for index, (_, seed, path) in enumerate(entries):
+        if index < len(entries) - _Uploader.max_pending:
+            os.remove(path)
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                files = json.load(file)
+        except ValueError:
+            os.remove(path)
+            continue
+        _outboxed.add(seed)
+        _Submit(seed, files)
+
+
+def Status() -> str:
+    """Describe the state of online tracker uploads, for display."""
+    lines = [f"Publishing to: {options.OnlineTrackerBackend.CurrentValue}"]
+
+    if _uploader.remaining is None or _uploader.reset_time is None:
+        lines.append("Remaining API requests: unknown")
+    else:
+        reset = time.localtime(_uploader.reset_time)
+        lines.append(
+            f"Remaining API requests: {_uploader.remaining}"
+            f" (resets at {time.strftime('%H:%M', reset)})"
+        )
+
+    delay = _uploader.next_send_time - time.time()
+    if delay > 0:
+        lines.append(f"Next upload allowed in {delay:.0f} seconds")
+    else:
+        lines.append("Uploads are not being delayed")
+
+    if _uploader.failures:
+        lines.append(f"Failed uploads in a row: {_uploader.failures}")
+
+    return "\n".join(lines)
+
+
+def update(
+    seed: str, header: str, sections: Sequence[Tuple[str, str]]
+) -> None:
+    """
+    Upload the given seed's tracker, as a summary file with its header named
+    after the seed, followed by a file for each of its sections. Only the
+    files that have changed since they were last uploaded are sent.
+    """
+    files = {seed: header}
+    for index, (title, content) in enumerate(sections, 1):
+        title = title.replace("/", "-")
+        files[f"{seed} {index:02} {title}"] = content
+
+    _Submit(seed, files)
+
+
+def _Submit(seed: str, files: Files) -> None:
+    if not CurrentBackend().configured():
+        return
+
+    for dropped in _uploader.submit(seed, files):
+        _ClearOutbox(dropped)
+
+
+def _SaveSettings() -> None:
+    """
+    Save the settings changed by an upload from the game thread on its next
+    tick, rather than from the uploader thread while the game may be using
+    or saving them itself.
+    """
+    do_next_tick(options.SaveSettings)
+
+
+def _Digest(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _UploadedDigest(destination: str, file_name: str) -> Optional[str]:
+    """The digest of the given file as last published to the destination."""
+    digests = options.UploadedDigests.CurrentValue
+    return digests.get(f"{destination}/{file_name}")
+
+
+def _ChangedFiles(destination: str, files: Files) -> Files:
+    return {
+        file_name: content
+        for file_name, content in files.items()
+        if _UploadedDigest(destination, file_name) != _Digest(content)
+    }
+
+
+def _UploadedFiles(destination: str, seed: str) -> List[str]:
+    """The names of the files for the given seed present at the destination."""
+    prefix = f"{destination}/"
+    file_names = []
+    for key in options.UploadedDigests.CurrentValue:
+        if not key.startswith(prefix):
+            continue
+        file_name = key[len(prefix):]
+        if file_name == seed or file_name.startswith(f"{seed} "):
+            file_names.append(file_name)
+    return file_names
+
+
+def _SetUploadedDigests(destination: str, files: Files) -> None:
+    # Only digests of files present at the current destination are of use.
+    digests = {
+        key: digest
+        for key, digest in options.UploadedDigests.CurrentValue.items()
+        if key.startswith(f"{destination}/")
+    }
+    for file_name, content in files.items():
+        digests.pop(f"{destination}/{file_name}", None)
+        if content:
+            digests[f"{destination}/{file_name}"] = _Digest(content)
+    while len(digests) > 64:
+        del digests[next(iter(digests))]
+    options.UploadedDigests.CurrentValue = digests
+
+
+def executeRequest(seed, files) -> Optional[requests.Response]:
+    # Only send the files that would change the gist, skipping the upload
+    # entirely if none would. Clearing the previous seed's files is then only
+    # ever sent along with a real change.
+    changed = _ChangedFiles(options.GistId.CurrentValue, files)
+    if not changed:
+        return None
+
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "Authorization": f"Bearer {options.GithubToken.CurrentValue}",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+
+    last_seed = options.LastSeed.CurrentValue
+    if (
+        last_seed != seed
+        and len(last_seed) > 0
+        and len(options.GistId.CurrentValue) > 0
+    ):
+        cleared = _UploadedFiles(options.GistId.CurrentValue, last_seed)
+        for file_name in cleared or [last_seed]:
+            changed.setdefault(file_name, "")
+
+    data = {
+        "description": f"Tracker for {seed}",
+        "files": {
+            file_name: {"content": content}
+            for file_name, content in changed.items()
+        }
+    }
+
+    if len(options.GistId.CurrentValue) == 0:
+        data["public"] = True
+        method = "POST"
+        url = GithubGistApi
+    else:
+        method = "PATCH"
+        url = f"{GithubGistApi}/{options.GistId.CurrentValue}"
+
+    dataString = json.dumps(data, indent=4)
+    response = _GetSession().request(
+        method, url, headers=headers, data=dataString, timeout=Timeout
+    )
+    if not response.ok:
+        return response
+
+    options.LastSeed.CurrentValue = seed
+
+    if response.status_code == 201:
+        gist = json.loads(response.content)
+        options.GistId.CurrentValue = gist["id"]
+        options.GistUrl.CurrentValue = gist["html_url"]
+
+    _SetUploadedDigests(options.GistId.CurrentValue, changed)
+    _SaveSettings()
+    return response
+
+
+class Backend(abc.ABC):
+    """
+    A destination the online tracker can be published to. Backends are only
+    called from the uploader thread, so they share its scheduling, outbox,
+    and pooled session, and never publish concurrently.
+    """
+
+    @abc.abstractmethod
+    def configured(self) -> bool:
+        raise NotImplementedError
+
+    def url(self) -> str:
+        """Where the published tracker can be viewed, if anywhere."""
+        return ""
+
+    @abc.abstractmethod
+    def publish(self, seed: str, files: Files) -> Optional[requests.Response]:
+        """
+        Publish the seed's files, returning the response to schedule further
+        uploads by, or None if nothing needed to be sent over the network.
+        """
+        raise NotImplementedError
+
+
+class GistBackend(Backend):
+    def configured(self) -> bool:
+        return options.GithubToken.CurrentValue != ''
+
+    def url(self) -> str:
+        return options.GistUrl.CurrentValue
+
+    def publish(self, seed: str, files: Files) -> Optional[requests.Response]:
+        return executeRequest(seed, files)
+
+
+class WebhookBackend(Backend):
+    """
+    Sends every file of the seed's tracker as a JSON object to a URL of our
+    choosing, whenever any of them change.
+    """
+
+    method: str
+
+    def __init__(self, method: str) -> None:
+        self.method = method
+
+    def configured(self) -> bool:
+        return options.TrackerDestination.CurrentValue.startswith(
+            ("http://", "https://")
+        )
+
+    def publish(self, seed: str, files: Files) -> Optional[requests.Response]:
+        url = options.TrackerDestination.CurrentValue
+        if not _ChangedFiles(url, files):
+            return None
+
+        response = _GetSession().request(
+            self.method,
+            url,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps({"seed": seed, "files": files}),
+            timeout=Timeout,
+        )
+        if response.ok:
+            _SetUploadedDigests(url, files)
+            _SaveSettings()
+        return response
+
+
+class DirectoryBackend(Backend):
+    """
+    Writes each changed file of the seed's tracker to a directory, such as a
+    share on the local network.
+    """
+
+    def configured(self) -> bool:
+        # A URL is meant for a webhook, not a directory named after it.
+        directory = options.TrackerDestination.CurrentValue
+        return directory != '' and not re.match(
+            r"[A-Za-z][A-Za-z0-9+.-]*://", directory
+        )
+
+    def url(self) -> str:
+        return options.TrackerDestination.CurrentValue
+
+    def publish(self, seed: str, files: Files) -> Optional[requests.Response]:
+        directory = options.TrackerDestination.CurrentValue
+        changed = _ChangedFiles(directory, files)
+        if not changed:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        for file_name, content in changed.items():
+            file_name = re.sub(r'[<>:"/\\|?*]', "-", file_name)
+            path = os.path.join(directory, f"{file_name}.txt")
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+
+        _SetUploadedDigests(directory, changed)
+        _SaveSettings()
+        return None
+
+
+Backends: Dict[str, Backend] = {
+    "Github Gist": GistBackend(),
+    "Webhook PUT": WebhookBackend("PUT"),
+    "Webhook POST": WebhookBackend("POST"),
+    "Directory": DirectoryBackend(),
+}
+
+
+def CurrentBackend() -> Backend:
+    return Backends.get(
+        options.OnlineTrackerBackend.CurrentValue, Backends["Github Gist"]
+    )
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from unrealsdk import Log
+
+from .defines import *
+from . import items
+
+import json, os
+
+from typing import Dict, List, Optional, Set, Tuple
+
+if BL2:
+    from .bl2.items import Items
+    from .bl2.locations import Locations
+elif TPS:
+    from .tps.items import Items
+    from .tps.locations import Locations
+else:
+    raise
+
+
+index_path = os.path.join(seeds_dir, "Tracker Index.json")
+
+_index_format = 2
+
+_location_prefixes = ("Enemy: ", "Mission: ", "Other: ")
+
+_location_names: Set[str] = {str(location) for location in Locations}
+# Duds are logged as found like any other item, as in Tracker.state.
+_item_names: Set[str] = {item.name for item in (*Items, items.DudItem)}
+
+
+class TrackerEntry:
+    """
+    The indexed contents of one tracker file. Each location maps to its
+    state (0 if nothing is logged, 1 if its hint is logged, or 2 if its item
+    is logged) and the logged hint or item name.
+    """
+
+    seed: str
+    mtime: int
+    size: int
+    locations: Dict[str, Tuple[int, str]]
+
+    def __init__(
+        self,
+        seed: str,
+        mtime: int,
+        size: int,
+        locations: Dict[str, Tuple[int, str]],
+    ) -> None:
+        self.seed = seed
+        self.mtime = mtime
+        self.size = size
+        self.locations = locations
+
+    @classmethod
+    def Parse(cls, path: str, mtime: int, size: int) -> Optional[TrackerEntry]:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        except UnicodeDecodeError:
+            with open(path, "r") as file:
+                lines = file.readlines()
+
+        header = "Loot Randomizer Seed "
+        if not (lines and lines[0].startswith(header)):
+            return None
+        seed = lines[0][len(header) :].strip()
+
+        locations: Dict[str, Tuple[int, str]] = dict()
+        for line in lines[1:]:
+            line = line.rstrip(" \r\n")
+            if not line.startswith(_location_prefixes):
+                continue
+
+            name, text = _split_location(line)
+            state = 0
+            if text:
+                state = 2 if text in _item_names else 1
+
+            if state >= locations.get(name, (0, ""))[0]:
+                locations[name] = (state, text)
+
+        return cls(seed, mtime, size, locations)
+
+    @property
+    def found(self) -> int:
+        return sum(state == 2 for state, _ in self.locations.values())
+
+    @property
+    def completion(self) -> float:
+        if not self.locations:
+            return 0
+        return self.found / len(self.locations)
+
+    def serialize(self) -> dict:
+        return {
+            "seed": self.seed,
+            "mtime": self.mtime,
+            "size": self.size,
+            "locations": [
+                [name, state, text]
+                for name, (state, text) in self.locations.items()
+            ],
+        }
+
+    @classmethod
+    def Deserialize(cls, data: dict) -> TrackerEntry:
+        return cls(
+            data["seed"],
+            data["mtime"],
+            data["size"],
+            {name: (state, text) for name, state, text in data["locations"]},
+        )
+
+
+def _split_location(line: str) -> Tuple[str, str]:
+    """
+    Split a tracker line into its location name and logged text, preferring
+    a split whose name is a known location.
+    """
+    separator = " - "
+    index = line.find(separator)
+    if index < 0:
+        return line, ""
+
+    first = index
+    while index >= 0:
+        if line[:index] in _location_names:
+            return line[:index], line[index + len(separator) :]
+        index = line.find(separator, index + 1)
+
+    if line in _location_names:
+        return line, ""
+    return line[:first], line[first + len(separator) :]
+
+
+_entries: Dict[str, TrackerEntry] = dict()
+_item_locations: Optional[Dict[str, List[Tuple[str, str]]]] = None
+_loaded: bool = False
+
+
+def _load() -> None:
+    global _loaded
+    _loaded = True
+
+    if not os.path.exists(index_path):
+        return
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("format") != _index_format:
+            return
+        for file_name, entry in data["trackers"].items():
+            _entries[file_name] = TrackerEntry.Deserialize(entry)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        Log(f"Could not load tracker index: {error}")
+        _entries.clear()
+
+
+def _save() -> None:
+    data = {
+        "format": _index_format,
+        "trackers": {
+            file_name: entry.serialize()
+            for file_name, entry in _entries.items()
+        },
+    }
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(temp_path, index_path)
+
+
+def Refresh() -> None:
+    """
+    Bring the index up to date with the tracker files in the seeds
+    directory, re-parsing only those which have changed since last indexed.
+    """
+    global _item_locations
+
+    if not _loaded:
+        _load()
+
+    if not os.path.isdir(seeds_dir):
+        return
+
+    changed = False
+    seen: Set[str] = set()
+
+    with os.scandir(seeds_dir) as scanned:
+        for dir_entry in scanned:
+            file_name = dir_entry.name
+            if not file_name.endswith(".txt") or not dir_entry.is_file():
+                continue
+            if dir_entry.path == seeds_file:
+                continue
+
+            seen.add(file_name)
+            stat = dir_entry.stat()
+            entry = _entries.get(file_name)
+            if (
+                entry
+                and entry.mtime == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                continue
+
+            try:
+                parsed = TrackerEntry.Parse(
+                    dir_entry.path, stat.st_mtime_ns, stat.st_size
+                )
+            except OSError as error:
+                Log(f"Could not index tracker {file_name}: {error}")
+                continue
+
+            if parsed:
+                _entries[file_name] = parsed
+            else:
+                _entries.pop(file_name, None)
+            changed = True
+
+    for file_name in set(_entries) - seen:
+        del _entries[file_name]
+        changed = True
+
+    if changed:
+        _item_locations = None
+        try:
+            _save()
+        except OSError as error:
+            Log(f"Could not save tracker index: {error}")
+
+
+def Trackers() -> List[TrackerEntry]:
+    return list(_entries.values())
+
+
+def FindItem(item_name: str) -> List[Tuple[str, str]]:
+    """Return the seed and location of every logged drop of the given item."""
+    global _item_locations
+
+    if _item_locations is None:
+        _item_locations = dict()
+        for entry in _entries.values():
+            for name, (state, text) in entry.locations.items():
+                if state == 2:
+                    _item_locations.setdefault(text, []).append(
+                        (entry.seed, name)
+                    )
+
+    return list(_item_locations.get(item_name, ()))
+
+
+def Completion() -> Dict[str, float]:
+    """Return the fraction of locations found for each indexed seed."""
+    return {entry.seed: entry.completion for entry in _entries.values()}
+
+
+def Unfinished() -> List[str]:
+    """Return the seeds which still have locations left to find."""
+    return [
+        entry.seed
+        for entry in _entries.values()
+        if entry.found < len(entry.locations)
+    ]
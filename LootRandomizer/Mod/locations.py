@@ -459,6 +459,9 @@ def _TryNewMap() -> None:
 
 def MapChanged(new_map_name: str) -> None:
     global map_name
+    if seed.AppliedSeed:
+        seed.AppliedSeed.compact_tracker()
+
     if map_name != menu_map_name:
         for map_dropper in MapDropper.Registrants("*", map_name):
             map_dropper.exited_map()
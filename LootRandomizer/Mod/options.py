@@ -5,7 +5,7 @@ from unrealsdk import RunHook, RemoveHook, UObject, UFunction, FStruct
 
 from Mods import ModMenu, UserFeedback
 
-from . import options, hints, seed
+from . import options, hints, seed, tracker, library, github, overlay
 from .defines import *
 from .seed import Seed
 
@@ -20,6 +20,8 @@ if TYPE_CHECKING:
 
 mod_instance: LootRandomizer
 
+_enabled: bool = False
+
 
 def SaveSettings() -> None:
     ModMenu.SaveModSettings(mod_instance)
@@ -165,7 +167,10 @@ def _SelectSeedApplyClicked() -> None:
 def _SeedTrackerClicked() -> None:
     if not seed.AppliedSeed:
         return
-    os.startfile(seed.AppliedSeed.generate_tracker())
+    path = seed.AppliedSeed.generate_tracker()
+    seed.AppliedSeed.compact_tracker()
+    tracker.Flush()
+    os.startfile(path)
 
 
 def _PopulateHintsClicked() -> None:
@@ -229,9 +234,53 @@ def _PopulateSpoilersClicked() -> None:
         confirmed,
     )
 
+def _SearchTrackersClicked() -> None:
+    _SearchTrackers()
+
+
+class _SearchTrackers(UserFeedback.TextInputBox):
+    def __init__(self) -> None:
+        super().__init__(
+            Title="Item to search for (blank for unfinished seeds)",
+            DefaultMessage="",
+        )
+        self.Show()
+
+    def OnSubmit(self, name: str) -> None:
+        if seed.AppliedSeed:
+            seed.AppliedSeed.compact_tracker()
+        tracker.Flush()
+        library.Refresh()
+
+        name = name.strip()
+        if name:
+            title = f"Trackers With {name}"
+            message = "\n".join(
+                f"{seed_string}: {location}"
+                for seed_string, location in library.FindItem(name)
+            )
+            if not message:
+                message = f"{name} has not been found in any tracker."
+        else:
+            title = "Unfinished Seeds"
+            completion = library.Completion()
+            message = "\n".join(
+                f"{seed_string}: {completion[seed_string]:.0%} found"
+                for seed_string in library.Unfinished()
+            )
+            if not message:
+                message = "Every tracked seed has been completed."
+
+        show_dialog(title, message)
+
+
 def _OpenOnlineTrackerClicked() -> None:
-    if (options.GistUrl.CurrentValue != ''):
-        os.startfile(options.GistUrl.CurrentValue)
+    url = github.CurrentBackend().url()
+    if (url != ''):
+        os.startfile(url)
+
+def _OnlineTrackerStatusClicked() -> None:
+    show_dialog("Online Tracker Status", github.Status())
 
 def _EnterGithubTokenClicked() -> None:
     _RequestGithubToken()
@@ -246,6 +295,30 @@ class _RequestGithubToken(UserFeedback.TextInputBox):
             options.GithubToken.CurrentValue = name
             options.SaveSettings()
 
+def _SetTrackerDestinationClicked() -> None:
+    _RequestTrackerDestination()
+
+class _RequestTrackerDestination(UserFeedback.TextInputBox):
+    def __init__(self):
+        super().__init__(
+            Title="Paste in the webhook URL or directory path",
+            DefaultMessage=options.TrackerDestination.CurrentValue,
+        )
+        self.Show()
+
+    def OnSubmit(self, destination: str) -> None:
+        options.TrackerDestination.CurrentValue = destination.strip()
+        options.SaveSettings()
+
+def _UpdateLiveTracker() -> None:
+    if not _enabled or LiveTracker.CurrentValue == "Off":
+        overlay.Stop()
+        return
+
+    overlay.Start(LiveTrackerPort.CurrentValue)
+    if seed.AppliedSeed:
+        overlay.Reset(seed.AppliedSeed.string, seed.AppliedSeed.tracker)
+
 def _ResetDismissedClicked() -> None:
     show_dialog(
         "Dismissed Hints Reset", "All hints items will now appear again."
@@ -473,7 +546,48 @@ OnlineTracker = ModMenu.Options.Boolean(
     Caption="Online Tracker",
     Description=(
         "Enables an online tracker for sharing with friends or "
-        "chat. Github account required."
+        "chat. Github account required for publishing to a gist."
+    ),
+    StartingValue=False,
+)
+
+OnlineTrackerBackend = ModMenu.Options.Spinner(
+    Caption="Online Tracker Destination",
+    Description=(
+        "Where to publish the online tracker: a Github gist, a webhook URL "
+        "receiving each update as JSON, or a directory such as a network "
+        "share."
+    ),
+    StartingValue="Github Gist",
+    Choices=("Github Gist", "Webhook PUT", "Webhook POST", "Directory"),
+)
+
+LiveTracker = CallbackSpinner(
+    Caption="Live Tracker Server",
+    Description=(
+        "Serve the tracker to stream overlays on this computer, at "
+        "http://localhost:8478/tracker.json, with each drop pushed as it "
+        "happens at http://localhost:8478/events."
+    ),
+    Callback=lambda value: _UpdateLiveTracker(),
+    StartingValue="Off",
+    Choices=("Off", "On"),
+)
+
+FixedWidthTracker = ModMenu.Options.Boolean(
+    Caption="Fixed Width Tracker",
+    Description=(
+        "Pad each location in newly created trackers to the same width, so "
+        "that drops can be written into the file in place."
+    ),
+    StartingValue=False,
+)
+
+TrackerDatabase = ModMenu.Options.Boolean(
+    Caption="Tracker Database",
+    Description=(
+        "Also record seed trackers and drops in a database in the Seeds "
+        "folder, for use by external tools and statistics."
     ),
     StartingValue=False,
 )
@@ -496,9 +610,18 @@ GistId = ModMenu.Options.Hidden(
 GistUrl = ModMenu.Options.Hidden(
     Caption="Github Gist Url", StartingValue=''
 )
+TrackerDestination = ModMenu.Options.Hidden(
+    Caption="Online Tracker Destination Path", StartingValue=''
+)
+LiveTrackerPort = ModMenu.Options.Hidden(
+    Caption="Live Tracker Server Port", StartingValue=8478
+)
 LastSeed = ModMenu.Options.Hidden(
     Caption="Last Seed Updated", StartingValue=''
 )
+UploadedDigests = ModMenu.Options.Hidden(
+    Caption="Uploaded Tracker Digests", StartingValue={}
+)
 
 Options: Sequence[ModMenu.Options.Base] = (
     _NewSeedOptions,
@@ -533,7 +656,19 @@ Options: Sequence[ModMenu.Options.Base] = (
                 ),
                 Callback=_PopulateSpoilersClicked,
             ),
+            CallbackField(
+                Caption="SEARCH TRACKERS",
+                Description=(
+                    "Search the trackers of every seed for where an item has "
+                    "been found, or for seeds that are not yet completed."
+                ),
+                Callback=_SearchTrackersClicked,
+            ),
+            FixedWidthTracker,
+            TrackerDatabase,
+            LiveTracker,
             OnlineTracker,
+            OnlineTrackerBackend,
             CallbackField(
                 Caption="OPEN ONLINE TRACKER",
                 Description=(
@@ -541,6 +676,14 @@ Options: Sequence[ModMenu.Options.Base] = (
                 ),
                 Callback=_OpenOnlineTrackerClicked,
             ),
+            CallbackField(
+                Caption="ONLINE TRACKER STATUS",
+                Description=(
+                    "Show the remaining Github API requests, and whether "
+                    "uploads to the online tracker are being delayed."
+                ),
+                Callback=_OnlineTrackerStatusClicked,
+            ),
             CallbackField(
                 Caption="SET GITHUB TOKEN",
                 Description=(
@@ -550,10 +693,21 @@ Options: Sequence[ModMenu.Options.Base] = (
                 ),
                 Callback=_EnterGithubTokenClicked,
             ),
+            CallbackField(
+                Caption="SET TRACKER DESTINATION",
+                Description=(
+                    "The webhook URL or directory path to publish the online "
+                    "tracker to, when not publishing to a Github gist."
+                ),
+                Callback=_SetTrackerDestinationClicked,
+            ),
             GithubToken,
             GistId,
             GistUrl,
-            LastSeed
+            TrackerDestination,
+            LiveTrackerPort,
+            LastSeed,
+            UploadedDigests,
         ),
     ),
     HintDisplay,
@@ -612,6 +766,12 @@ def Enable():
             if dlc_path and bool(dlc.CanUse()):
                 OwnedContent |= tag
 
+    github.DrainOutbox()
+
+    global _enabled
+    _enabled = True
+    _UpdateLiveTracker()
+
     if (
         _CurrentSeed.CurrentValue in _SeedsList.Choices
         and _CurrentSeed.CurrentValue != _SeedsList.StartingValue
@@ -666,6 +826,13 @@ def Enable():
 def Disable():
     if seed.AppliedSeed:
         seed.AppliedSeed.unapply()
+    github.SaveOutbox()
+    tracker.Flush()
+    github.Close()
+
+    global _enabled
+    _enabled = False
+    _UpdateLiveTracker()
 
     RemoveHook("WillowGame.WillowScrollingList.OnClikEvent", "LootRandomizer")
     RemoveHook("WillowGame.WillowGameInfo.PostLogin", "LootRandomizer")
@@ -0,0 +1,228 @@
+"""
+Live tracker server for stream overlays, listening on localhost only.
+
+Serves the applied seed's tracker as JSON at /tracker.json, and pushes each
+change to it as a server-sent event at /events. The server only ever reads
+state kept here in memory, which the game thread updates as the tracker
+changes; the tracker file itself is never read.
+
+Events at /events are a "tracker" event with the full tracker whenever the
+applied seed or its tracker is reset (including on connecting), followed by a
+"location" event for each location whose hint or item is logged. Clients
+reconnecting with a Last-Event-ID header resume from the events they missed,
+if those are still buffered.
+"""
+
+from __future__ import annotations
+
+from unrealsdk import Log
+
+import collections, json, threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .tracker import Tracker
+
+
+Host = "127.0.0.1"
+
+# Seconds between comments sent to keep idle event streams open.
+KeepAliveInterval = 15
+
+_max_events = 256
+
+_condition = threading.Condition()
+_seed: Optional[str] = None
+_progress: str = ""
+_locations: Dict[str, Dict[str, Any]] = dict()
+_event_id: int = 0
+_events: Deque[Tuple[int, str, str]] = collections.deque(maxlen=_max_events)
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def _location_text(seed_tracker: Tracker, name: str, position: int) -> str:
+    line = seed_tracker.lines[position].rstrip("\n")
+    return line[len(name) + 3 :]
+
+
+def _snapshot() -> str:
+    return json.dumps(
+        {
+            "seed": _seed,
+            "progress": _progress,
+            "locations": list(_locations.values()),
+        }
+    )
+
+
+def _push(event: str, data: str) -> None:
+    global _event_id
+    _event_id += 1
+    _events.append((_event_id, event, data))
+    _condition.notify_all()
+
+
+def Reset(seed: Optional[str], seed_tracker: Optional[Tracker]) -> None:
+    """Replace the served tracker with that of the given seed, if any."""
+    global _seed, _progress
+
+    if not _server:
+        return
+
+    locations: Dict[str, Dict[str, Any]] = dict()
+    progress = ""
+    if seed_tracker:
+        progress = seed_tracker.progress.line().rstrip("\n")
+        for position, section, name, state in seed_tracker.entries()[1]:
+            locations.setdefault(
+                name,
+                {
+                    "name": name,
+                    "section": section,
+                    "state": state,
+                    "text": _location_text(seed_tracker, name, position),
+                },
+            )
+
+    with _condition:
+        _seed = seed if seed_tracker else None
+        _progress = progress
+        _locations.clear()
+        _locations.update(locations)
+        _push("tracker", _snapshot())
+
+
+def Update(seed_tracker: Tracker, name: str) -> None:
+    """Push the current state of the given location to every client."""
+    global _progress
+
+    if not _server:
+        return
+
+    position = seed_tracker.position(name)
+    if position is None:
+        return
+
+    with _condition:
+        location = _locations.get(name)
+        if location is None:
+            return
+        location["state"] = seed_tracker.state(name, position)
+        location["text"] = _location_text(seed_tracker, name, position)
+        _progress = seed_tracker.progress.line().rstrip("\n")
+        _push("location", json.dumps({**location, "progress": _progress}))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _headers(self, status: int, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/tracker.json":
+            with _condition:
+                data = _snapshot().encode("utf-8")
+            self._headers(200, "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif path == "/events":
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self) -> None:
+        self._headers(200, "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            last_id = int(self.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            last_id = -1
+
+        while _server:
+            with _condition:
+                if last_id == _event_id:
+                    _condition.wait(KeepAliveInterval)
+
+                pending: List[Tuple[int, str, str]] = [
+                    event for event in _events if event[0] > last_id
+                ]
+                if not 0 <= last_id <= _event_id or (
+                    _event_id > last_id
+                    and (not pending or pending[0][0] > last_id + 1)
+                ):
+                    # The client is new, or has missed events that are no
+                    # longer buffered, so it starts over from a snapshot.
+                    pending = [(_event_id, "tracker", _snapshot())]
+                if pending:
+                    last_id = pending[-1][0]
+
+            if pending:
+                message = "".join(
+                    f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+                    for event_id, event, data in pending
+                )
+            else:
+                message = ":\n\n"
+
+            try:
+                self.wfile.write(message.encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def Start(port: int) -> None:
+    """Start serving on the given port, if not already serving."""
+    global _server
+
+    if _server:
+        return
+
+    try:
+        server = _Server((Host, port), _Handler)
+    except OSError as error:
+        Log(f"Could not start live tracker server on port {port}: {error}")
+        return
+
+    _server = server
+    threading.Thread(
+        target=server.serve_forever,
+        name="LootRandomizer.LiveTracker",
+        daemon=True,
+    ).start()
+
+
+def Stop() -> None:
+    """Stop serving, closing every open event stream."""
+    global _server, _seed
+
+    with _condition:
+        server, _server = _server, None
+        _seed = None
+        _locations.clear()
+        _events.clear()
+        _condition.notify_all()
+
+    if server:
+        server.shutdown()
+        server.server_close()
@@ -7,12 +7,17 @@ from .defines import *
 from . import options, items, hints, enemies, missions
 from .locations import Location
 from .items import ItemPool
+from . import tracker, store, overlay
+from .tracker import Progress, Tracker
 from Mods.LootRandomizer.Mod import github
 
 from base64 import b32encode, b32decode
-import random, os, importlib, threading
+import random, os, importlib, threading, mmap, struct, hashlib, json
+import time
 
-from typing import List, Optional, Sequence
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from typing import Type, Union
+from typing import overload
 from types import ModuleType
 
 if BL2:
@@ -31,6 +36,50 @@ AppliedSeed: Optional[Seed] = None
 AppliedTags: Tag = Tag(0)
 
 
+_items_by_name: Dict[str, ItemPool] = dict()
+for _item in Items:
+    _items_by_name.setdefault(_item.name, _item)
+
+_locations_by_name: Dict[str, Location] = dict()
+for _location in Locations:
+    _locations_by_name.setdefault(str(_location), _location)
+
+
+_missions_by_path: Dict[str, Set[Location]] = dict()
+for _location in Locations:
+    if isinstance(_location, missions.Mission):
+        for _dropper in _location.droppers:
+            if isinstance(_dropper, missions.MissionDefinition):
+                for _path in _dropper.paths:
+                    _missions_by_path.setdefault(_path.casefold(), set()).add(
+                        _location
+                    )
+
+_mission_siblings: Dict[Location, Set[Location]] = dict()
+for _siblings in _missions_by_path.values():
+    if len(_siblings) > 1:
+        for _location in _siblings:
+            _mission_siblings.setdefault(_location, set()).update(_siblings)
+
+
+def _digest_tables() -> str:
+    digest = hashlib.sha1()
+    for item in Items:
+        digest.update(f"{item.name}\0{int(item.tags)}\n".encode("utf-8"))
+        for member in (*item.items, *item.fallbacks):
+            digest.update(
+                f"\t{member.path}\0{int(member.content)}\n".encode("utf-8")
+            )
+    for location in Locations:
+        digest.update(f"{location}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+_tables_digest = _digest_tables()
+
+assignments_dir = os.path.join(seeds_dir, "Assignments")
+
+
 class SeedEntry:
     __slots__ = ("name", "tags")
 
@@ -42,20 +91,214 @@ class SeedEntry:
         self.tags = tags
 
     def match_item(self) -> ItemPool:
-        for item in Items:
-            if item.name == self.name:
-                return item
+        item = _items_by_name.get(self.name)
+        if item:
+            return item
         raise ValueError(f"Could not locate item for seed entry '{self.name}'")
 
     def match_location(self) -> Location:
-        for location in Locations:
-            if str(location) == self.name:
-                return location
+        location = _locations_by_name.get(self.name)
+        if location:
+            return location
         raise ValueError(
             f"Could not locate location for seed entry '{self.name}'"
         )
 
 
+_manifest_magic = b"LRSV"
+_manifest_format = 1
+
+# magic, format, version tags, string count, item count, location count
+_manifest_header = struct.Struct("<4sHQIII")
+_manifest_offset = struct.Struct("<I")
+# string table index, tags
+_manifest_entry = struct.Struct("<IQ")
+
+
+class _ManifestEntries(Sequence[SeedEntry]):
+    """
+    The SeedEntry records of a mapped seed version manifest, decoded all at
+    once on first use, then served from a tuple like a module's would be.
+    """
+
+    _manifest: SeedManifest
+    _start: int
+    _count: int
+    _entries: Optional[Tuple[SeedEntry, ...]]
+
+    def __init__(self, manifest: SeedManifest, start: int, count: int) -> None:
+        self._manifest = manifest
+        self._start = start
+        self._count = count
+        self._entries = None
+
+    @property
+    def entries(self) -> Tuple[SeedEntry, ...]:
+        if self._entries is None:
+            self._entries = self._manifest.entries(self._start, self._count)
+        return self._entries
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[SeedEntry]:
+        return iter(self.entries)
+
+    @overload
+    def __getitem__(self, index: int) -> SeedEntry:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[SeedEntry]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[SeedEntry, Sequence[SeedEntry]]:
+        return self.entries[index]
+
+
+class SeedManifest:
+    """
+    Compact binary form of a seed version module, as written by
+    generate_seedmanifests. Contains the same Tags, Items and Locations as the
+    corresponding vN.py module, without needing to compile and run it.
+    """
+
+    Tags: Tag
+    Items: Sequence[SeedEntry]
+    Locations: Sequence[SeedEntry]
+
+    _map: mmap.mmap
+    _strings: Optional[List[str]]
+    _tags: Dict[int, Tag]
+    _offsets_start: int
+    _blob_start: int
+    _entries_start: int
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format, tags, string_count, item_count, location_count = (
+            _manifest_header.unpack_from(self._map, 0)
+        )
+        if magic != _manifest_magic or format != _manifest_format:
+            self._map.close()
+            raise ValueError(f"Invalid seed manifest at {path}")
+
+        self.Tags = Tag(tags)
+        self._strings = None
+        self._tags = dict()
+
+        self._offsets_start = _manifest_header.size
+        self._blob_start = (
+            self._offsets_start + _manifest_offset.size * (string_count + 1)
+        )
+        (blob_size,) = _manifest_offset.unpack_from(
+            self._map,
+            self._offsets_start + _manifest_offset.size * string_count,
+        )
+        self._entries_start = self._blob_start + blob_size
+
+        self.Items = _ManifestEntries(self, 0, item_count)
+        self.Locations = _ManifestEntries(self, item_count, location_count)
+
+    @property
+    def strings(self) -> List[str]:
+        """The string table, decoded in a single pass on first use."""
+        if self._strings is None:
+            offsets = [
+                offset
+                for (offset,) in _manifest_offset.iter_unpack(
+                    self._map[self._offsets_start : self._blob_start]
+                )
+            ]
+            blob = self._map[self._blob_start : self._entries_start]
+            self._strings = [
+                blob[start:end].decode("utf-8")
+                for start, end in zip(offsets, offsets[1:])
+            ]
+        return self._strings
+
+    def entries(self, start: int, count: int) -> Tuple[SeedEntry, ...]:
+        """Decode the given range of entries in a single pass."""
+        position = self._entries_start + _manifest_entry.size * start
+        block = self._map[position : position + _manifest_entry.size * count]
+
+        strings = self.strings
+        entries: List[SeedEntry] = []
+        for string_index, tags in _manifest_entry.iter_unpack(block):
+            # Entries share few distinct masks, and constructing a Tag is slow.
+            tag = self._tags.get(tags)
+            if tag is None:
+                tag = self._tags[tags] = Tag(tags)
+            entries.append(SeedEntry(strings[string_index], tag))
+        return tuple(entries)
+
+    @staticmethod
+    def Write(
+        path: str,
+        tags: Tag,
+        items: Sequence[SeedEntry],
+        locations: Sequence[SeedEntry],
+    ) -> None:
+        strings: Dict[str, int] = dict()
+        entries: List[bytes] = []
+        for entry in (*items, *locations):
+            string_index = strings.setdefault(entry.name, len(strings))
+            entries.append(
+                _manifest_entry.pack(string_index, int(entry.tags))
+            )
+
+        offsets: List[bytes] = []
+        blob: List[bytes] = []
+        blob_size = 0
+        for string in strings:
+            offsets.append(_manifest_offset.pack(blob_size))
+            encoded = string.encode("utf-8")
+            blob.append(encoded)
+            blob_size += len(encoded)
+        offsets.append(_manifest_offset.pack(blob_size))
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(
+                _manifest_header.pack(
+                    _manifest_magic,
+                    _manifest_format,
+                    int(tags),
+                    len(strings),
+                    len(items),
+                    len(locations),
+                )
+            )
+            file.writelines(offsets)
+            file.writelines(blob)
+            file.writelines(entries)
+        os.replace(temp_path, path)
+
+
+def _manifest_path(version: int) -> str:
+    return os.path.join(mod_dir, "Mod", module_name, f"v{version}.manifest")
+
+
+def load_seedversion(version: int) -> Union[ModuleType, SeedManifest]:
+    """
+    Load the seed version data for the given version, preferring its compiled
+    manifest, as written by generate_seedmanifests. Without a valid manifest,
+    its Python module is imported instead.
+    """
+    manifest_path = _manifest_path(version)
+    if os.path.isfile(manifest_path):
+        try:
+            return SeedManifest(manifest_path)
+        except (OSError, ValueError, struct.error) as error:
+            Log(error)
+
+    return importlib.import_module(f".{module_name}.v{version}", __package__)
+
+
 def _stringify(data: bytes) -> str:
     string = b32encode(data).decode("ascii").strip("=").lower()
     return f"{string[0:5]}-{string[5:10]}-{string[10:15]}"
@@ -68,12 +311,14 @@ class Seed:
     version: int
     tags: Tag
 
-    version_module: ModuleType
+    version_module: Union[ModuleType, SeedManifest]
 
     locations: Sequence[Location]
     items: Sequence[ItemPool]
     item_count: int
 
+    tracker: Optional[Tracker] = None
+
     def __init__(
         self, data: bytes, version: int, tags: Tag, string: str
     ) -> None:
@@ -154,8 +399,7 @@ class Seed:
                 f"Seed {self.string} requires additional DLCs to play:{missing_dlcs}"
             )
 
-        if AppliedSeed:
-            AppliedSeed.unapply()
+        previous_seed = AppliedSeed
 
         AppliedSeed = self
         AppliedTags = self.tags
@@ -163,9 +407,68 @@ class Seed:
         if not is_client():
             options.mod_instance.SendSeed(self.string)
 
-        self.version_module = importlib.import_module(
-            f".{module_name}.v{self.version}", __package__
+        self.version_module = load_seedversion(self.version)
+        if not self.load_assignment():
+            self.assign()
+            self.save_assignment()
+
+        if previous_seed:
+            previous_seed.compact_tracker()
+            self.switch_from(previous_seed)
+        else:
+            for location, item in zip(self.locations, self.items):
+                location.item = item
+                location.update_hint()
+                location.toggle_hint(True)
+
+            for location in Locations:
+                location.enable()
+
+        self.generate_tracker()
+        overlay.Reset(self.string, self.tracker)
+
+    def switch_from(self, previous_seed: Seed) -> None:
+        """
+        Transition from the previously applied seed by only disabling and
+        re-enabling the locations whose assigned item (or lack thereof)
+        differs between the two seeds.
+        """
+        previous = dict(zip(previous_seed.locations, previous_seed.items))
+        current = dict(zip(self.locations, self.items))
+
+        changed: Set[Location] = set()
+        for location in Locations:
+            if previous.get(location) is not current.get(location):
+                changed.add(location)
+
+        # Missions sharing a MissionDefinition select between each other based
+        # on the applied locations, so they must be re-enabled together.
+        for location in tuple(changed):
+            changed.update(_mission_siblings.get(location, ()))
+
+        for location in Locations:
+            if location in changed:
+                location.item = None
+                location.disable()
+
+        for location, item in zip(self.locations, self.items):
+            if location in changed:
+                location.item = item
+                location.update_hint()
+                location.toggle_hint(True)
+
+        for location in Locations:
+            if location in changed:
+                location.enable()
+
+        touched = sum(len(location.droppers) for location in changed)
+        total = sum(len(location.droppers) for location in Locations)
+        Log(
+            f"Switched to seed {self.string}: re-enabled {len(changed)} of "
+            f"{len(Locations)} locations ({touched} of {total} droppers)"
         )
+
+    def assign(self) -> None:
         version_items: Sequence[SeedEntry] = self.version_module.Items
         version_locations: Sequence[SeedEntry] = self.version_module.Locations
 
@@ -205,20 +508,93 @@ class Seed:
             self.items += [items.DudItem] * (location_count - item_count)
             randomizer.shuffle(self.items)
 
-        for location, item in zip(self.locations, self.items):
-            location.item = item
-            location.update_hint()
-            location.toggle_hint(True)
+    @property
+    def assignment_path(self) -> str:
+        return os.path.join(
+            assignments_dir,
+            f"{module_name}-v{self.version}-{self.data.hex()}.json",
+        )
 
-        for location in Locations:
-            location.enable()
+    def load_assignment(self) -> bool:
+        """
+        Restore this seed's location and item assignment from the on-disk
+        cache, returning whether it was successful.
+        """
+        try:
+            with open(self.assignment_path, "r", encoding="utf-8") as file:
+                cache = json.load(file)
 
-        self.generate_tracker()
+            if cache["digest"] != _tables_digest:
+                return False
+
+            assigned_locations = tuple(
+                Locations[index] for index in cache["locations"]
+            )
+            assigned_items = [
+                Items[index] if index >= 0 else items.DudItem
+                for index in cache["items"]
+            ]
+            for index, applied in cache["applied"].items():
+                item = Items[int(index)]
+                members = (*item.items, *item.fallbacks)
+                item.applied_items = [members[member] for member in applied]
+            item_count = cache["item_count"]
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return False
+
+        self.locations = assigned_locations
+        self.items = assigned_items
+        self.item_count = item_count
+        return True
+
+    def save_assignment(self) -> None:
+        item_indexes = {item: index for index, item in enumerate(Items)}
+
+        applied: Dict[str, List[int]] = dict()
+        for item in self.items:
+            if item is items.DudItem:
+                continue
+            members = (*item.items, *item.fallbacks)
+            applied[str(item_indexes[item])] = [
+                members.index(member) for member in item.applied_items
+            ]
+
+        location_indexes = {
+            location: index for index, location in enumerate(Locations)
+        }
+
+        cache = {
+            "digest": _tables_digest,
+            "item_count": self.item_count,
+            "locations": [
+                location_indexes[location] for location in self.locations
+            ],
+            "items": [
+                -1 if item is items.DudItem else item_indexes[item]
+                for item in self.items
+            ],
+            "applied": applied,
+        }
+
+        try:
+            if not os.path.isdir(assignments_dir):
+                os.mkdir(assignments_dir)
+
+            temp_path = self.assignment_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(cache, file, separators=(",", ":"))
+            os.replace(temp_path, self.assignment_path)
+        except OSError as error:
+            Log(error)
 
     def unapply(self) -> None:
         global AppliedSeed, AppliedTags
+        self.compact_tracker()
+        tracker.Flush()
+
         AppliedSeed = None
         AppliedTags = Tag(0)
+        overlay.Reset(None, None)
 
         for location in Locations:
             location.item = None
@@ -226,134 +602,232 @@ class Seed:
 
     def generate_tracker(self) -> str:
         path = os.path.join(seeds_dir, f"{self.string}.txt")
-        if os.path.exists(path):
+        if self.tracker:
             return path
 
-        version_tags: Tag = self.version_module.Tags
+        tracker.Flush()
 
-        fullContent = ''
-        with open(path, "w", encoding="utf-8") as file:
-            item_warning = (
-                " (not all accessible)"
-                if self.item_count > len(self.locations)
-                else ""
-            )
+        # With the database enabled, the text tracker is rendered from it
+        # whenever it holds the seed.
+        stored = None
+        if options.TrackerDatabase.CurrentValue:
+            stored = store.Render(self.string, module_name)
 
-            file.write(
-                f"Loot Randomizer Seed {self.string}\n\n"
-                f"Total locations: {len(self.locations)}\n"
-                f"Total items: {self.item_count}{item_warning}\n\n"
-            )
+        if os.path.exists(path) and not stored:
+            self.tracker = Tracker.Read(path, self.locations, self.items)
+            self.store_tracker()
+            return path
 
-            fullContent += f"Loot Randomizer Seed {self.string}\n\n"
-            fullContent += f"Total locations: {len(self.locations)}\n"
-            fullContent += f"Total items: {self.item_count}{item_warning}\n\n"
+        if stored:
+            lines = stored.splitlines(keepends=True)
+        else:
+            lines = list(self.tracker_lines())
 
-            for tag in TagList:
-                if tag not in version_tags:
-                    continue
+        width = None
+        if options.FixedWidthTracker.CurrentValue:
+            width = Tracker.RecordWidth(self.locations, self.items)
 
-                caption = getattr(tag, "caption", None)
-                if caption:
-                    file.write(
-                        f"{tag.caption}: {'On' if (tag in self.tags) else 'Off'}\n"
-                    )
-                    fullContent += f"{tag.caption}: {'On' if (tag in self.tags) else 'Off'}\n"
+        self.tracker = Tracker(
+            path, lines, self.locations, self.items, width
+        )
 
-            for tag in TagList:
-                if not tag & ContentTags & self.tags:
-                    continue
+        if stored and os.path.exists(path):
+            # Keep anything only logged in the text tracker, such as while
+            # the database was disabled.
+            items: Dict[str, ItemPool] = dict()
+            for location, item in zip(self.locations, self.items):
+                items.setdefault(str(location), item)
 
-                locations = tuple(
-                    location
-                    for location in Locations
-                    if tag in location.content and location in self.locations
-                )
-                if not len(locations):
-                    continue
+            text_tracker = Tracker.Read(path, self.locations, self.items)
+            for _, _, name, state in text_tracker.entries()[1]:
+                if state:
+                    self.tracker.update(name, items[name], state == 2)
 
-                file.write(f"\n{tag.content_title}\n")
-                fullContent += f"\n{tag.content_title}\n"
+        self.tracker.reset_journal()
+        self.tracker.save()
+        self.store_tracker()
 
-                for location in locations:
-                    file.write(f"{location}\n")
-                    fullContent += f"{location}\n"
-        
-        self.update_online_tracker(fullContent)
+        self.update_online_tracker()
 
         return path
 
-    def update_tracker(self, location: Location, drop: bool) -> None:
-        if not is_client():
-            options.mod_instance.SendTracker(str(location), drop)
+    def tracker_lines(self) -> Iterator[str]:
+        """
+        Yield the lines of a new tracker for this seed, with the applied
+        locations grouped by content tag in a single pass.
+        """
+        version_tags: Tag = self.version_module.Tags
 
-        if not (location.item and options.AutoLog.CurrentValue):
-            return
+        content_tags = [
+            tag for tag in TagList if tag & ContentTags & self.tags
+        ]
+        sections: Dict[Tag, List[Location]] = {tag: [] for tag in content_tags}
+        tracked: Set[Location] = set()
 
-        if options.HintDisplay.CurrentValue == "None" and not drop:
-            return
+        # Content tags are single flags, so test their plain integer values
+        # rather than going through Tag's (much slower) operators.
+        tag_values = [(tag, int(tag)) for tag in content_tags]
 
-        log_item = bool(drop or options.HintDisplay.CurrentValue == "Spoiler")
+        applied = set(self.locations)
+        for location in Locations:
+            if location not in applied:
+                continue
+            content = int(location.content)
+            for tag, value in tag_values:
+                if content & value:
+                    sections[tag].append(location)
+                    tracked.add(location)
+
+        progress = Progress(
+            (location, item)
+            for location, item in zip(self.locations, self.items)
+            if location in tracked
+        )
 
-        none_log = f"{location.tracker_name}\n"
-        hint_log = f"{location.tracker_name} - {location.item.hint}\n"
-        full_log = f"{location.tracker_name} - {location.item.name}\n"
+        item_warning = (
+            " (not all accessible)"
+            if self.item_count > len(self.locations)
+            else ""
+        )
 
-        path = self.generate_tracker()
+        yield f"Loot Randomizer Seed {self.string}\n"
+        yield "\n"
+        yield f"Total locations: {len(self.locations)}\n"
+        yield f"Total items: {self.item_count}{item_warning}\n"
+        yield progress.line()
+        yield "\n"
 
-        try:
-            with open(path, "r", encoding="utf-8") as file:
-                lines = file.readlines()
-        except:
-            with open(path, "r") as file:
-                lines = file.readlines()
+        for tag in TagList:
+            if tag not in version_tags:
+                continue
 
-        for index in range(len(lines)):
-            line = lines[index]
+            caption = getattr(tag, "caption", None)
+            if caption:
+                state = "On" if (tag in self.tags) else "Off"
+                yield f"{tag.caption}: {state}\n"
 
-            if line == none_log:
-                lines[index] = full_log if log_item else hint_log
-                with open(path, "w", encoding="utf-8") as file:
-                    file.writelines(lines)
-                self.update_online_tracker(''.join(lines))
-                return
+        for tag in content_tags:
+            if not sections[tag]:
+                continue
 
-            if line == hint_log:
-                if log_item:
-                    lines[index] = full_log
-                    with open(path, "w", encoding="utf-8") as file:
-                        file.writelines(lines)
-                    self.update_online_tracker(''.join(lines))
-                return
+            yield "\n"
+            yield f"{tag.content_title}\n"
 
-            if line == full_log:
-                return
+            for location in sections[tag]:
+                yield f"{location}\n"
 
-    def populate_tracker(self, spoiler: bool) -> None:
-        path = self.generate_tracker()
+    def store_tracker(self) -> None:
+        """Replace this seed's entries in the tracker database, if enabled."""
+        if not (self.tracker and options.TrackerDatabase.CurrentValue):
+            return
 
-        with open(path, "r", encoding="utf-8") as file:
-            lines = file.readlines()
+        content_tags = {
+            tag.content_title: tag.value
+            for tag in TagList
+            if tag & ContentTags and getattr(tag, "content_title", None)
+        }
 
+        assigned: Dict[str, Tuple[Location, ItemPool]] = dict()
         for location, item in zip(self.locations, self.items):
-            none_log = f"{location}\n"
-            hint_log = f"{location} - {item.hint}\n"
-            full_log = f"{location} - {item.name}\n"
+            assigned.setdefault(str(location), (location, item))
+
+        header, entries = self.tracker.entries()
+
+        store.RegisterSeed(
+            self.string,
+            module_name,
+            self.version,
+            int(self.tags),
+            self.item_count,
+            header,
+            [
+                (
+                    position,
+                    section,
+                    content_tags.get(section, 0),
+                    name,
+                    name.split(":", 1)[0],
+                    int(assigned[name][0].content),
+                    assigned[name][1].name,
+                    assigned[name][1].hint,
+                    state,
+                )
+                for position, section, name, state in entries
+            ],
+            time.time(),
+        )
+
+    @property
+    def progress(self) -> Optional[Progress]:
+        """The live progress counts of this seed's tracker, if it has one."""
+        return self.tracker.progress if self.tracker else None
+
+    def compact_tracker(self) -> None:
+        if self.tracker:
+            self.tracker.compact()
+
+    def update_tracker(self, location: Location, drop: bool) -> None:
+        if not is_client():
+            options.mod_instance.SendTracker(str(location), drop)
 
-            for index in range(len(lines)):
-                line = lines[index]
+        if not (location.item and options.AutoLog.CurrentValue):
+            return
 
-                if line == full_log:
-                    break
+        if options.HintDisplay.CurrentValue == "None" and not drop:
+            return
 
-                if line in (none_log, hint_log):
-                    lines[index] = full_log if spoiler else hint_log
-                    break
+        log_item = bool(drop or options.HintDisplay.CurrentValue == "Spoiler")
 
-        with open(path, "w", encoding="utf-8") as file:
-            file.writelines(lines)
+        if not self.tracker:
+            self.generate_tracker()
+        seed_tracker: Tracker = self.tracker  # type: ignore
+
+        name = location.tracker_name
+        if seed_tracker.update(name, location.item, log_item):
+            seed_tracker.record(name, log_item)
+            overlay.Update(seed_tracker, name)
+            self.update_online_tracker()
+
+            position = seed_tracker.position(name)
+            if options.TrackerDatabase.CurrentValue and position is not None:
+                store.RecordDrop(
+                    self.string,
+                    module_name,
+                    position,
+                    seed_tracker.state(name, position),
+                    time.time(),
+                )
 
-        self.update_online_tracker(''.join(lines))
+    def populate_tracker(
+        self,
+        spoiler: bool,
+        content: Tag = Tag(0),
+        category: Optional[Type[Location]] = None,
+    ) -> None:
+        """
+        Fill in the hint or spoiler for every applied location in a single
+        pass. May be restricted to the locations belonging to the given
+        content tags, and/or of the given location class.
+        """
+        if not self.tracker:
+            self.generate_tracker()
+        seed_tracker: Tracker = self.tracker  # type: ignore
+
+        changed = False
+        for location, item in zip(self.locations, self.items):
+            if content and not (location.content & content):
+                continue
+            if category and not isinstance(location, category):
+                continue
+            if seed_tracker.populate(str(location), item, spoiler):
+                changed = True
+
+        if changed:
+            seed_tracker.save()
+            self.store_tracker()
+            if self is AppliedSeed:
+                overlay.Reset(self.string, seed_tracker)
+            self.update_online_tracker()
 
     def populate_hints(self) -> None:
         self.populate_tracker(False)
@@ -361,9 +835,11 @@ class Seed:
     def populate_spoilers(self) -> None:
         self.populate_tracker(True)
 
-    def update_online_tracker(self, content) -> None:
-        if options.OnlineTracker.CurrentValue:
-            github.update(self.string, content)
+    def update_online_tracker(self) -> None:
+        if options.OnlineTracker.CurrentValue and self.tracker:
+            header, sections = self.tracker.sections()
+            github.update(self.string, header, sections)
+
 
 def generate_wikis(version: int = CurrentVersion) -> None:
     from html import escape
@@ -513,6 +989,37 @@ def generate_seedversion() -> None:
 
         file.write(f")\n")
 
+    _write_seedmanifest(CurrentVersion)
+
+
+def _write_seedmanifest(version: int) -> None:
+    """
+    Write the manifest of the given seed version from its module, reloading
+    the module in case it has been regenerated since it was imported, so that
+    the manifest always holds exactly the module's tags.
+    """
+    version_module = importlib.import_module(
+        f".{module_name}.v{version}", __package__
+    )
+    version_module = importlib.reload(version_module)
+    SeedManifest.Write(
+        _manifest_path(version),
+        version_module.Tags,
+        version_module.Items,
+        version_module.Locations,
+    )
+
+
+def generate_seedmanifests() -> None:
+    """Write the manifest of every seed version module, supported or not."""
+    for version in range(1, CurrentVersion + 1):
+        module_path = os.path.join(
+            mod_dir, "Mod", module_name, f"v{version}.py"
+        )
+        if os.path.isfile(module_path):
+            _write_seedmanifest(version)
+
+
 """
 TODO:
 - add option under Configure Tracker to fill in items missing from seed
@@ -0,0 +1,259 @@
+"""
+Structured store mirroring every seed's tracker in a SQLite database in the
+seeds directory, so that trackers can be queried without parsing text files.
+
+Statements are queued by the calling thread and executed by the tracker
+worker, with everything queued since its last wake-up run in a single
+transaction.
+"""
+
+from __future__ import annotations
+
+from unrealsdk import Log
+
+from . import tracker
+from .defines import seeds_dir
+
+import os, threading
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None  # type: ignore
+
+
+database_path = os.path.join(seeds_dir, "Trackers.sqlite3")
+
+_schema = """
+CREATE TABLE IF NOT EXISTS seeds (
+    id INTEGER PRIMARY KEY,
+    string TEXT NOT NULL,
+    game TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    tags INTEGER NOT NULL,
+    item_count INTEGER NOT NULL,
+    header TEXT NOT NULL,
+    created REAL NOT NULL,
+    UNIQUE (string, game)
+);
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    name TEXT NOT NULL,
+    class TEXT NOT NULL,
+    content INTEGER NOT NULL,
+    UNIQUE (game, name)
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    seed_id INTEGER NOT NULL REFERENCES seeds (id),
+    position INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    content_tag INTEGER NOT NULL,
+    location_id INTEGER NOT NULL REFERENCES locations (id),
+    item TEXT NOT NULL,
+    hint TEXT NOT NULL,
+    state INTEGER NOT NULL,
+    PRIMARY KEY (seed_id, position)
+);
+CREATE INDEX IF NOT EXISTS assignments_location
+    ON assignments (location_id);
+CREATE INDEX IF NOT EXISTS assignments_content_tag
+    ON assignments (content_tag);
+CREATE TABLE IF NOT EXISTS drops (
+    id INTEGER PRIMARY KEY,
+    seed_id INTEGER NOT NULL REFERENCES seeds (id),
+    location_id INTEGER NOT NULL REFERENCES locations (id),
+    state INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drops_seed ON drops (seed_id);
+CREATE INDEX IF NOT EXISTS drops_location ON drops (location_id);
+"""
+
+_seed_id = "(SELECT id FROM seeds WHERE string = ? AND game = ?)"
+
+# (position, section, content tag, location name, location class, location
+#  content, item name, item hint, state)
+Entry = Tuple[int, str, int, str, str, int, str, str, int]
+
+
+_lock = threading.Lock()
+_statements: List[Tuple[str, Sequence[Sequence[Any]]]] = []
+_connection: Optional[sqlite3.Connection] = None
+
+
+def Available() -> bool:
+    return sqlite3 is not None
+
+
+def _connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(database_path)
+    connection.executescript(_schema)
+    return connection
+
+
+def _execute() -> None:
+    global _connection
+
+    with _lock:
+        statements = list(_statements)
+        _statements.clear()
+    if not statements:
+        return
+
+    if not _connection:
+        _connection = _connect()
+
+    try:
+        with _connection:
+            for statement, parameters in statements:
+                _connection.executemany(statement, parameters)
+    except sqlite3.Error as error:
+        Log(f"Failed to update tracker database: {error}")
+        _connection.close()
+        _connection = None
+
+
+def _queue(*statements: Tuple[str, Sequence[Sequence[Any]]]) -> None:
+    if not Available():
+        return
+    with _lock:
+        _statements.extend(statements)
+    tracker.Defer("store", _execute)
+
+
+def RegisterSeed(
+    string: str,
+    game: str,
+    version: int,
+    tags: int,
+    item_count: int,
+    header: Sequence[str],
+    entries: Sequence[Entry],
+    created: float,
+) -> None:
+    """Replace the stored tracker for the given seed with the given entries."""
+    _queue(
+        (
+            "INSERT OR IGNORE INTO seeds"
+            " (string, game, version, tags, item_count, header, created)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((string, game, version, tags, item_count, "", created),),
+        ),
+        (
+            "UPDATE seeds SET header = ? WHERE string = ? AND game = ?",
+            (("".join(header), string, game),),
+        ),
+        (
+            "INSERT OR IGNORE INTO locations (game, name, class, content)"
+            " VALUES (?, ?, ?, ?)",
+            [(game, entry[3], entry[4], entry[5]) for entry in entries],
+        ),
+        (
+            f"DELETE FROM assignments WHERE seed_id = {_seed_id}",
+            ((string, game),),
+        ),
+        (
+            "INSERT INTO assignments (seed_id, position, section, content_tag,"
+            " location_id, item, hint, state)"
+            f" VALUES ({_seed_id}, ?, ?, ?,"
+            " (SELECT id FROM locations WHERE game = ? AND name = ?),"
+            " ?, ?, ?)",
+            [
+                (string, game, *entry[:3], game, entry[3], *entry[6:])
+                for entry in entries
+            ],
+        ),
+    )
+
+
+def RecordDrop(
+    string: str, game: str, position: int, state: int, timestamp: float
+) -> None:
+    """Record a drop event, advancing the state of its assignment."""
+    _queue(
+        (
+            "INSERT INTO drops (seed_id, location_id, state, timestamp)"
+            " SELECT seed_id, location_id, ?, ? FROM assignments"
+            f" WHERE seed_id = {_seed_id} AND position = ?",
+            ((state, timestamp, string, game, position),),
+        ),
+        (
+            "UPDATE assignments SET state = MAX(state, ?)"
+            f" WHERE seed_id = {_seed_id} AND position = ?",
+            ((state, string, game, position),),
+        ),
+    )
+
+
+def Render(string: str, game: str) -> Optional[str]:
+    """
+    Render the text tracker for the given seed from the store, or return None
+    if it has not been stored.
+    """
+    if not Available():
+        return None
+
+    tracker.Flush()
+    if not os.path.exists(database_path):
+        return None
+
+    try:
+        connection = sqlite3.connect(database_path)
+        try:
+            row = connection.execute(
+                "SELECT header FROM seeds WHERE string = ? AND game = ?",
+                (string, game),
+            ).fetchone()
+            if row is None:
+                return None
+
+            assignments = connection.execute(
+                "SELECT section, locations.name, item, hint, state"
+                " FROM assignments"
+                " JOIN locations ON locations.id = location_id"
+                f" WHERE seed_id = {_seed_id}"
+                " ORDER BY position",
+                (string, game),
+            ).fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error as error:
+        Log(f"Failed to read tracker database: {error}")
+        return None
+
+    # The progress line is recomputed, as the stored header is only that of
+    # the last time the seed was registered.
+    total = [0, 0, 0]
+    categories: Dict[str, List[int]] = dict()
+    states: Dict[str, int] = dict()
+    for _, name, _, _, state in assignments:
+        states.setdefault(name, state)
+    for name, state in states.items():
+        total[state] += 1
+        category = name.split(":", 1)[0]
+        categories.setdefault(category, [0, 0, 0])[state] += 1
+
+    lines: List[str] = [
+        tracker.ProgressLine(total, categories)
+        if line.startswith("Found: ")
+        else line
+        for line in row[0].splitlines(keepends=True)
+    ]
+    current_section: Optional[str] = None
+
+    for section, name, item, hint, state in assignments:
+        if section != current_section:
+            current_section = section
+            lines.append(f"\n{section}\n")
+
+        if state == 2:
+            lines.append(f"{name} - {item}\n")
+        elif state == 1:
+            lines.append(f"{name} - {hint}\n")
+        else:
+            lines.append(f"{name}\n")
+
+    return "".join(lines)
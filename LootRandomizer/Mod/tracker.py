@@ -0,0 +1,688 @@
+from __future__ import annotations
+
+from unrealsdk import Log
+
+from .defines import *
+
+import mmap, os, threading, time
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .items import ItemPool
+    from .locations import Location
+
+
+def _encoded_length(line: str) -> int:
+    """The length in bytes of the given line once written to a text file."""
+    return len(line.encode("utf-8")) + line.count("\n") * (len(os.linesep) - 1)
+
+
+class _PendingFile:
+    reset: bool
+    appends: List[str]
+    content: Optional[Iterable[str]]
+    patches: Dict[int, bytes]
+
+    def __init__(self) -> None:
+        self.reset = False
+        self.appends = []
+        self.content = None
+        self.patches = dict()
+
+
+class _Writer:
+    """
+    Write-behind worker owning all tracker file I/O. Callers only enqueue
+    changes; everything pending for a given file when the worker wakes is
+    coalesced into at most one journal append, one tracker write, and one
+    set of in-place patches. Other deferred operations are coalesced by key,
+    and run after the file writes.
+    """
+
+    _condition: threading.Condition
+    _pending: Dict[str, _PendingFile]
+    _operations: Dict[str, Callable[[], None]]
+    _busy: bool
+    _thread: Optional[threading.Thread]
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._pending = dict()
+        self._operations = dict()
+        self._busy = False
+        self._thread = None
+
+    def _start(self) -> None:
+        if not self._thread:
+            self._thread = threading.Thread(
+                target=self._run, name="LootRandomizer.Tracker", daemon=True
+            )
+            self._thread.start()
+        self._condition.notify_all()
+
+    def _submit(self, path: str) -> _PendingFile:
+        self._start()
+        pending = self._pending.get(path)
+        if not pending:
+            pending = self._pending[path] = _PendingFile()
+        return pending
+
+    def reset(self, journal_path: str) -> None:
+        with self._condition:
+            pending = self._submit(journal_path)
+            pending.reset = True
+            pending.appends.clear()
+
+    def append(self, journal_path: str, record: str) -> None:
+        with self._condition:
+            self._submit(journal_path).appends.append(record)
+
+    def write(self, path: str, lines: Iterable[str]) -> None:
+        with self._condition:
+            pending = self._submit(path)
+            pending.content = lines
+            pending.patches.clear()
+
+    def patch(self, path: str, offset: int, data: bytes) -> None:
+        with self._condition:
+            self._submit(path).patches[offset] = data
+
+    def call(self, key: str, operation: Callable[[], None]) -> None:
+        with self._condition:
+            self._start()
+            self._operations[key] = operation
+
+    def flush(self) -> None:
+        with self._condition:
+            while self._pending or self._operations or self._busy:
+                self._condition.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not (self._pending or self._operations):
+                    self._condition.wait()
+                batch = self._pending
+                operations = self._operations
+                self._pending = dict()
+                self._operations = dict()
+                self._busy = True
+
+            for path, pending in batch.items():
+                try:
+                    if pending.reset and os.path.exists(path):
+                        os.remove(path)
+
+                    if pending.appends:
+                        with open(path, "a", encoding="utf-8") as file:
+                            file.write("".join(pending.appends))
+
+                    if pending.content is not None:
+                        temp_path = path + ".tmp"
+                        with open(temp_path, "w", encoding="utf-8") as file:
+                            file.writelines(pending.content)
+                        os.replace(temp_path, path)
+
+                    if pending.patches:
+                        with open(path, "r+b") as file, mmap.mmap(
+                            file.fileno(), 0
+                        ) as mapped:
+                            for offset, data in pending.patches.items():
+                                end = offset + len(data)
+                                if end <= len(mapped):
+                                    mapped[offset:end] = data
+                            mapped.flush()
+                        # Writes through a mapping may not update the file's
+                        # modification time (notably on Windows), which the
+                        # tracker library relies on to spot changed files.
+                        os.utime(path)
+                except Exception as error:
+                    Log(f"Failed to write tracker file {path}: {error}")
+
+            for operation in operations.values():
+                try:
+                    operation()
+                except Exception as error:
+                    Log(f"Failed to run tracker operation: {error}")
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+
+_writer = _Writer()
+
+
+def Flush() -> None:
+    """Block until all pending tracker file writes have completed."""
+    _writer.flush()
+
+
+def Defer(key: str, operation: Callable[[], None]) -> None:
+    """
+    Run the given operation on the tracker worker after any pending file
+    writes. Operations submitted under the same key before the worker gets
+    to them are coalesced, only the latest being run.
+    """
+    _writer.call(key, operation)
+
+
+class Progress:
+    """
+    Running counts of the locations in a tracker, in total and per content
+    tag, location category, and hint. Each count is a list indexed by
+    location state; unseen, hinted, then found.
+    """
+
+    total: List[int]
+    content: Dict[Tag, List[int]]
+    categories: Dict[str, List[int]]
+    hints: Dict[Hint, List[int]]
+
+    _counts: Dict[str, Tuple[List[int], ...]]
+
+    def __init__(
+        self, assignments: Iterable[Tuple[Location, ItemPool]]
+    ) -> None:
+        self.total = [0, 0, 0]
+        self.content = dict()
+        self.categories = dict()
+        self.hints = dict()
+        self._counts = dict()
+
+        # Content tags are single flags, tested by their integer values.
+        content_tags = [
+            (tag, int(tag)) for tag in TagList if tag & ContentTags
+        ]
+
+        for location, item in assignments:
+            name = str(location)
+            if name in self._counts:
+                continue
+
+            counts = [self.total]
+            content = int(location.content)
+            for tag, value in content_tags:
+                if content & value:
+                    counts.append(self.content.setdefault(tag, [0, 0, 0]))
+
+            category = name.split(":", 1)[0]
+            counts.append(self.categories.setdefault(category, [0, 0, 0]))
+            counts.append(self.hints.setdefault(item.hint, [0, 0, 0]))
+
+            self._counts[name] = tuple(counts)
+            for count in counts:
+                count[0] += 1
+
+    def move(self, name: str, old_state: int, new_state: int) -> None:
+        if old_state == new_state:
+            return
+        for count in self._counts.get(name, ()):
+            count[old_state] -= 1
+            count[new_state] += 1
+
+    def line(self, maximum: bool = False) -> str:
+        return ProgressLine(self.total, self.categories, maximum)
+
+
+def ProgressLine(
+    total: List[int], categories: Dict[str, List[int]], maximum: bool = False
+) -> str:
+    """
+    The progress line for a tracker header, from the given total and per
+    location category counts. If maximum is set, every count is rendered as
+    its total, to give the longest possible line.
+    """
+
+    def found(count: List[int]) -> str:
+        locations = sum(count)
+        return f"{locations if maximum else count[2]}/{locations}"
+
+    hinted = sum(total) if maximum else total[1]
+    category_counts = ", ".join(
+        f"{category}: {found(count)}"
+        for category, count in sorted(categories.items())
+    )
+    return (
+        f"Found: {found(total)} locations, {hinted} hinted"
+        f" ({category_counts})\n"
+    )
+
+
+class Tracker:
+    """
+    In-memory model of a seed's tracker file. Each applied location's line is
+    indexed by its tracker name, so that logging a drop does not require
+    re-reading or scanning the file.
+
+    Drops are recorded in an append-only journal next to the tracker file,
+    and folded back into the tracker file by compact() at safe points. Since
+    applying a record is idempotent, the journal is kept as a timestamped
+    drop history and fully replayed when the tracker is read.
+
+    With a record width, every location line is padded with spaces to that
+    many bytes, so that drops are patched into the tracker file in place at
+    a known offset rather than waiting to be compacted.
+
+    Progress counts are kept up to date with every change, and written into
+    the tracker's header line for them when it is compacted.
+
+    The text of the header and of each section is kept between calls to
+    sections(), only being joined again for those whose lines changed. When
+    they make up the whole tracker, as in trackers we generate, it is saved
+    from these same texts.
+
+    Only reading happens on the calling thread; journal and tracker writes
+    are handed off to the write-behind worker.
+    """
+
+    compact_threshold: int = 25
+
+    path: str
+    journal_path: str
+    lines: List[str]
+    width: Optional[int]
+    progress: Progress
+    pending: int = 0
+
+    _indexes: Dict[str, int]
+    _offsets: List[int]
+    _progress_index: Optional[int]
+    _progress_width: int
+    _items: Dict[str, ItemPool]
+    _names: Dict[str, str]
+
+    _header_length: int
+    _section_titles: List[str]
+    _section_positions: List[List[int]]
+    _section_of: Dict[int, int]
+    _texts: Optional[List[str]]
+    _texts_cover: bool
+    _stale: Set[int]
+
+    def __init__(
+        self,
+        path: str,
+        lines: List[str],
+        locations: Sequence[Location],
+        items: Sequence[ItemPool],
+        width: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.lines = lines
+        self.width = width
+        self._texts = None
+        self._texts_cover = False
+        self._stale = set()
+
+        self._items = dict()
+        names: Dict[str, str] = dict()
+        for location, item in zip(locations, items):
+            name = str(location)
+            self._items.setdefault(name, item)
+            names.setdefault(f"{name}\n", name)
+            names.setdefault(f"{name} - {item.hint}\n", name)
+            names.setdefault(f"{name} - {item.name}\n", name)
+
+        self._names = names
+        self._indexes = dict()
+        for index, line in enumerate(lines):
+            name = names.get(line)
+            if name is not None:
+                self._indexes.setdefault(name, index)
+
+        self.progress = Progress(
+            (location, item)
+            for location, item in zip(locations, items)
+            if str(location) in self._indexes
+        )
+        for name, index in self._indexes.items():
+            self.progress.move(name, 0, self.state(name, index))
+
+        self._progress_index = None
+        for index, line in enumerate(lines):
+            if line in names:
+                break
+            if line.startswith("Found: "):
+                self._progress_index = index
+                break
+        self._progress_width = _encoded_length(self.progress.line(True))
+
+        self._offsets = []
+        offset = 0
+        for index in range(len(lines)):
+            self._offsets.append(offset)
+            offset += _encoded_length(self.padded(index))
+
+    @staticmethod
+    def RecordWidth(
+        locations: Sequence[Location], items: Sequence[ItemPool]
+    ) -> int:
+        """The record width fitting every state of the given locations."""
+        width = 0
+        for location, item in zip(locations, items):
+            for text in (item.name, item.hint):
+                width = max(
+                    width, _encoded_length(f"{location} - {text}\n")
+                )
+        return width
+
+    @classmethod
+    def Read(
+        cls,
+        path: str,
+        locations: Sequence[Location],
+        items: Sequence[ItemPool],
+    ) -> Tracker:
+        _writer.flush()
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        except UnicodeDecodeError:
+            with open(path, "r") as file:
+                lines = file.readlines()
+
+        # Location records follow the header, so the last padded line gives
+        # the record width.
+        width: Optional[int] = None
+        for index, line in enumerate(lines):
+            if line.endswith(" \n"):
+                width = _encoded_length(line)
+                lines[index] = line.rstrip(" \n") + "\n"
+
+        tracker = cls(path, lines, locations, items, width)
+
+        if width and tracker.size != os.path.getsize(path):
+            # The layout does not match the one we would write; fall back to
+            # rewriting the file without padding.
+            tracker.width = None
+            tracker.pending += 1
+
+        tracker.replay()
+        return tracker
+
+    @property
+    def content(self) -> str:
+        return "".join(self.lines)
+
+    @property
+    def size(self) -> int:
+        """The length in bytes of the tracker file in its current layout."""
+        if not self.lines:
+            return 0
+        last = len(self.lines) - 1
+        return self._offsets[last] + _encoded_length(self.padded(last))
+
+    def padded(self, position: int) -> str:
+        """The line at the given position as written to the tracker file."""
+        line = self.lines[position]
+        if not self.width:
+            return line
+
+        if position == self._progress_index:
+            width = self._progress_width
+        elif line in self._names:
+            width = self.width
+        else:
+            return line
+
+        return line[:-1] + " " * (width - _encoded_length(line)) + "\n"
+
+    def _patch(self, position: int) -> None:
+        data = self.padded(position).replace("\n", os.linesep)
+        _writer.patch(self.path, self._offsets[position], data.encode("utf-8"))
+
+    def _set(self, name: str, position: int, line: str) -> None:
+        old_state = self.state(name, position)
+        self.lines[position] = line
+        self._stale.add(position)
+        self.progress.move(name, old_state, self.state(name, position))
+
+    def state(self, name: str, position: int) -> int:
+        """
+        The state of the location line at the given position; 0 if nothing
+        is logged, 1 if its hint is logged, or 2 if its item is logged.
+        """
+        line = self.lines[position]
+        if line == f"{name}\n":
+            return 0
+        item = self._items[name]
+        if line == f"{name} - {item.hint}\n" and item.hint != item.name:
+            return 1
+        return 2
+
+    def position(self, name: str) -> Optional[int]:
+        return self._indexes.get(name)
+
+    def entries(self) -> Tuple[List[str], List[Tuple[int, str, str, int]]]:
+        """
+        Split the tracker into its header lines, and the position, section
+        title, tracker name and state of each location line.
+        """
+        header: List[str] = list(self.lines)
+        entries: List[Tuple[int, str, str, int]] = []
+        section = ""
+
+        for position, line in enumerate(self.lines):
+            name = self._names.get(line)
+            if name is None:
+                continue
+
+            if position and self.lines[position - 1] not in self._names:
+                if not entries:
+                    header = self.lines[: max(position - 2, 0)]
+                section = self.lines[position - 1].rstrip("\n")
+
+            entries.append(
+                (position, section, name, self.state(name, position))
+            )
+
+        return header, entries
+
+    def _text(self, section: int) -> str:
+        """The text of the given section, or of the header if negative."""
+        if section < 0:
+            return "".join(self.lines[: self._header_length])
+        positions = self._section_positions[section]
+        return f"{self._section_titles[section]}\n" + "".join(
+            self.lines[position] for position in positions
+        )
+
+    def sections(self) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Split the tracker into its header, and the title and content of each
+        section of locations.
+        """
+        if self._texts is None:
+            header, entries = self.entries()
+
+            sections: Dict[str, List[int]] = dict()
+            for position, section, _, _ in entries:
+                sections.setdefault(section, []).append(position)
+
+            # Location lines never move, so the layout is only worked out
+            # once, and each line's section is kept to re-join it alone.
+            self._header_length = len(header)
+            self._section_titles = list(sections)
+            self._section_positions = list(sections.values())
+            self._section_of = {
+                position: section
+                for section, positions in enumerate(self._section_positions)
+                for position in positions
+            }
+            self._texts = [
+                self._text(section) for section in range(-1, len(sections))
+            ]
+            self._stale.clear()
+
+            # Whether the tracker is exactly its header followed by each
+            # section after a blank line, so that it can be saved as is.
+            expected = self._header_length
+            self._texts_cover = True
+            for title, positions in zip(
+                self._section_titles, self._section_positions
+            ):
+                start = expected + 2
+                if not (
+                    self.lines[expected : start] == ["\n", f"{title}\n"]
+                    and positions == list(range(start, start + len(positions)))
+                ):
+                    self._texts_cover = False
+                    break
+                expected = start + len(positions)
+            if expected != len(self.lines):
+                self._texts_cover = False
+
+        elif self._stale:
+            stale = set()
+            for position in self._stale:
+                if position < self._header_length:
+                    stale.add(-1)
+                elif position in self._section_of:
+                    stale.add(self._section_of[position])
+            self._stale.clear()
+
+            for section in stale:
+                self._texts[section + 1] = self._text(section)
+
+        return self._texts[0], list(zip(self._section_titles, self._texts[1:]))
+
+    def update(self, name: str, item: ItemPool, log_item: bool) -> bool:
+        """
+        Log the hint or item for the location with the given tracker name,
+        returning whether its line changed.
+        """
+        index: Optional[int] = self._indexes.get(name)
+        if index is None:
+            return False
+
+        line = self.lines[index]
+
+        if line == f"{name}\n":
+            self._set(
+                name,
+                index,
+                (
+                    f"{name} - {item.name}\n"
+                    if log_item
+                    else f"{name} - {item.hint}\n"
+                ),
+            )
+            return True
+
+        if log_item and line == f"{name} - {item.hint}\n":
+            self._set(name, index, f"{name} - {item.name}\n")
+            return True
+
+        return False
+
+    def populate(self, name: str, item: ItemPool, spoiler: bool) -> bool:
+        """
+        Fill in the hint or spoiler for the location with the given tracker
+        name, returning whether its line changed.
+        """
+        index: Optional[int] = self._indexes.get(name)
+        if index is None:
+            return False
+
+        line = self.lines[index]
+        if line in (f"{name}\n", f"{name} - {item.hint}\n"):
+            populated = (
+                f"{name} - {item.name}\n"
+                if spoiler
+                else f"{name} - {item.hint}\n"
+            )
+            if line != populated:
+                self._set(name, index, populated)
+                return True
+
+        return False
+
+    def record(self, name: str, log_item: bool) -> None:
+        """
+        Append a drop for the location with the given tracker name to the
+        journal, compacting it into the tracker file past the threshold.
+        """
+        state = "item" if log_item else "hint"
+        _writer.append(
+            self.journal_path, f"{time.time():.3f}\t{state}\t{name}\n"
+        )
+
+        index = self._indexes.get(name)
+        if self.width and index is not None:
+            if _encoded_length(self.lines[index]) <= self.width:
+                self._patch(index)
+                return
+
+            # The record does not fit; fall back to rewriting the file
+            # without padding.
+            self.width = None
+
+        self.pending += 1
+        if self.pending >= self.compact_threshold:
+            self.compact()
+
+    def replay(self) -> None:
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            for record in file:
+                fields = record.rstrip("\n").split("\t", 2)
+                if len(fields) != 3:
+                    continue
+                _, state, name = fields
+
+                item = self._items.get(name)
+                if item and self.update(name, item, state == "item"):
+                    self.pending += 1
+
+    def reset_journal(self) -> None:
+        _writer.reset(self.journal_path)
+
+    def refresh_progress(self) -> None:
+        """Write the current progress counts into the tracker's header."""
+        index = self._progress_index
+        if index is None:
+            return
+
+        line = self.progress.line()
+        if self.lines[index] == line:
+            return
+
+        self.lines[index] = line
+        self._stale.add(index)
+        if self.width:
+            self._patch(index)
+        else:
+            self.pending += 1
+
+    def compact(self) -> None:
+        self.refresh_progress()
+        if self.pending:
+            self.save()
+
+    def save(self) -> None:
+        if self._progress_index is not None:
+            self.lines[self._progress_index] = self.progress.line()
+            self._stale.add(self._progress_index)
+
+        lines: Iterable[str]
+        if not self.width and self.sections() and self._texts_cover:
+            # Saved from the section texts kept for the online tracker, each
+            # after the blank line separating it from the last.
+            header, *texts = self._texts or ("",)
+            lines = [header]
+            for text in texts:
+                lines += ("\n", text)
+        else:
+            # Padded as the worker writes them, rather than all copied here.
+            # Lines changed meanwhile are journaled, so being ahead is safe.
+            lines = (self.padded(index) for index in range(len(self.lines)))
+        _writer.write(self.path, lines)
+        self.pending = 0
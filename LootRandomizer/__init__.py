@@ -32,7 +32,11 @@ if __name__ == "__main__":
         game_module_name + ".items",
         game_module_name + ".locations",
         *(f"{game_module_name}.v{version}" for version in range(1, 32)),
+        "tracker",
+        "store",
+        "overlay",
         "seed",
+        "library",
     )
 
     import sys, importlib
@@ -44,6 +48,7 @@ if __name__ == "__main__":
 
 
 from Mods.LootRandomizer.Mod import (
+    defines,
     options,
     hints,
     items,
@@ -69,6 +74,7 @@ class LootRandomizer(ModMenu.SDKMod):
     Options = options.Options
 
     def Enable(self):
+        defines.Enable()
         hints.Enable()
         items.Enable()
         locations.Enable()
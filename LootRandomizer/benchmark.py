@@ -0,0 +1,875 @@
+"""
+Headless benchmarks for Loot Randomizer.
+
+Times the mod's hot paths outside of the game, using the stand-in unrealsdk
+and ModMenu modules bundled in the Headless directory. Where the approach a
+path replaced can be reproduced, it is timed alongside for comparison.
+Each game is benchmarked in a fresh process, as the mod's tables are chosen
+at import time. Example usage:
+
+    python benchmark.py apply
+    python benchmark.py apply --game tps
+    python benchmark.py drops
+    python benchmark.py io
+    python benchmark.py latency
+    python benchmark.py populate
+    python benchmark.py generate
+    python benchmark.py imports
+    python benchmark.py ticks
+"""
+
+from __future__ import annotations
+
+import argparse, collections, importlib, multiprocessing, os, random, sys
+import subprocess, tempfile, time, types
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import headless
+
+
+def _best(function: Callable[[], Any], repeat: int = 5) -> float:
+    """The fastest of several runs of the function, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _milliseconds(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}ms"
+
+
+def apply(game: str) -> List[str]:
+    """
+    Time resolving and assigning an all-tags seed of every supported version,
+    with the name indexes used by SeedEntry, and with the linear scans over
+    the item and location tables they replaced.
+    """
+    from Mods.LootRandomizer.Mod import seed
+    from Mods.LootRandomizer.Mod.defines import SupportedVersions, Tag
+
+    def match_item(entry: seed.SeedEntry) -> Any:
+        for item in seed.Items:
+            if item.name == entry.name:
+                return item
+        raise ValueError(
+            f"Could not locate item for seed entry '{entry.name}'"
+        )
+
+    def match_location(entry: seed.SeedEntry) -> Any:
+        for location in seed.Locations:
+            if str(location) == entry.name:
+                return location
+        raise ValueError(
+            f"Could not locate location for seed entry '{entry.name}'"
+        )
+
+    indexed = (seed.SeedEntry.match_item, seed.SeedEntry.match_location)
+    linear = (match_item, match_location)
+
+    # Every tag, as with the default seed of each player.
+    tags = Tag(2**36 - 1)
+    report = []
+    for version in SupportedVersions:
+        version_seed = seed.Seed.Generate(tags, version)
+        version_seed.version_module = seed.load_seedversion(version)
+
+        timings = []
+        for matchers in (linear, indexed):
+            seed.SeedEntry.match_item, seed.SeedEntry.match_location = matchers
+            timings.append(_best(version_seed.assign))
+        seed.SeedEntry.match_item, seed.SeedEntry.match_location = indexed
+
+        report.append(
+            f"{game} v{version}: {len(version_seed.locations)} locations,"
+            f" linear {_milliseconds(timings[0])},"
+            f" indexed {_milliseconds(timings[1])}"
+            f" ({timings[0] / timings[1]:.0f}x)"
+        )
+    return report
+
+
+def manifest(game: str) -> List[str]:
+    """
+    Time loading the data of every seed version, and applying an all-tags
+    seed with it, from its compiled manifest and by importing its module,
+    either from source or from cached bytecode.
+    """
+    from Mods.LootRandomizer.Mod import seed
+    from Mods.LootRandomizer.Mod.defines import SupportedVersions, Tag
+
+    package = f"Mods.LootRandomizer.Mod.{seed.module_name}"
+    directory = os.path.join(seed.mod_dir, "Mod", seed.module_name)
+
+    def compile_module(version: int) -> Any:
+        path = os.path.join(directory, f"v{version}.py")
+        with open(path, "r", encoding="utf-8") as file:
+            code = compile(file.read(), path, "exec")
+        module = types.ModuleType(f"{package}.v{version}")
+        module.__package__ = package
+        exec(code, module.__dict__)
+        return module
+
+    def import_module(version: int) -> Any:
+        sys.modules.pop(f"{package}.v{version}", None)
+        return importlib.import_module(f"{package}.v{version}")
+
+    def load_manifest(version: int) -> Any:
+        return seed.SeedManifest(seed._manifest_path(version))
+
+    loaders = (
+        ("source", compile_module),
+        ("bytecode", import_module),
+        ("manifest", load_manifest),
+    )
+
+    report = []
+    for version in SupportedVersions:
+        # Write the bytecode cache, as the game would have on a prior run.
+        import_module(version)
+
+        version_seed = seed.Seed.Generate(Tag(2**36 - 1), version)
+        loads = []
+        applies = []
+        for _, loader in loaders:
+            loads.append(_best(lambda: loader(version)))
+
+            def apply() -> None:
+                version_seed.version_module = loader(version)
+                version_seed.assign()
+
+            applies.append(_best(apply))
+
+        report.append(
+            f"{game} v{version}: load "
+            + ", ".join(
+                f"{name} {_milliseconds(load)}"
+                for (name, _), load in zip(loaders, loads)
+            )
+            + "; apply "
+            + ", ".join(
+                f"{name} {_milliseconds(apply)}"
+                for (name, _), apply in zip(loaders, applies)
+            )
+        )
+    return report
+
+
+def _tracked_seed(directory: str, tags: Optional[Any] = None) -> Any:
+    """
+    A seed with its items placed, tracked in the given directory, of the
+    given tags or otherwise every tag.
+    """
+    from Mods.LootRandomizer.Mod import options, seed
+    from Mods.LootRandomizer.Mod.defines import Tag
+
+    seed.seeds_dir = directory
+    options.OnlineTracker.CurrentValue = False
+    options.TrackerDatabase.CurrentValue = False
+    options.AutoLog.CurrentValue = True
+    options.HintDisplay.CurrentValue = "Vague"
+
+    tracked_seed = seed.Seed.Generate(Tag(2**36 - 1) if tags is None else tags)
+    tracked_seed.version_module = seed.load_seedversion(tracked_seed.version)
+    tracked_seed.assign()
+    for location, item in zip(tracked_seed.locations, tracked_seed.items):
+        location.item = item
+    return tracked_seed
+
+
+def _read_scan_rewrite(path: str, location: Any, drop: bool) -> None:
+    """Log a drop in the given tracker file as it was before the Tracker."""
+    none_log = f"{location.tracker_name}\n"
+    hint_log = f"{location.tracker_name} - {location.item.hint}\n"
+    full_log = f"{location.tracker_name} - {location.item.name}\n"
+
+    os.path.exists(path)
+    with open(path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    for index in range(len(lines)):
+        line = lines[index]
+        if line == none_log:
+            lines[index] = full_log if drop else hint_log
+            with open(path, "w", encoding="utf-8") as file:
+                file.writelines(lines)
+            return
+        if line == hint_log:
+            if drop:
+                lines[index] = full_log
+                with open(path, "w", encoding="utf-8") as file:
+                    file.writelines(lines)
+            return
+        if line == full_log:
+            return
+
+
+def drops(game: str, count: int = 10000) -> List[str]:
+    """
+    Time logging consecutive drops into an all-tags seed's tracker, through
+    the in-memory tracker model, and by reading, scanning and rewriting the
+    tracker file for each drop as it was before. Drops are drawn at random,
+    so later ones are mostly repeats which leave the tracker unchanged.
+    """
+    from Mods.LootRandomizer.Mod import seed, tracker
+
+    # Stand in for the host, so that drops are not sent to other players.
+    seed.is_client = lambda: True
+
+    tracked_seed = _tracked_seed(tempfile.mkdtemp())
+    randomizer = random.Random(0)
+    session = [
+        (randomizer.choice(tracked_seed.locations), randomizer.random() < 0.5)
+        for _ in range(count)
+    ]
+
+    tracked_seed.generate_tracker()
+    tracker.Flush()
+    seed_tracker = tracked_seed.tracker
+    path = os.path.join(tempfile.mkdtemp(), "tracker.txt")
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(seed_tracker.lines)
+
+    started = time.perf_counter()
+    for location, drop in session:
+        _read_scan_rewrite(path, location, drop)
+    before = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for location, drop in session:
+        tracked_seed.update_tracker(location, drop)
+    tracker.Flush()
+    after = time.perf_counter() - started
+
+    with open(path, "r", encoding="utf-8") as file:
+        expected = [line for line in file if line in seed_tracker._names]
+    logged = [
+        line for line in seed_tracker.lines if line in seed_tracker._names
+    ]
+    if logged != expected:
+        raise AssertionError("Tracker differs from the read-scan-rewrite one")
+
+    return [
+        f"{game}: {count} drops over {len(tracked_seed.locations)} locations,"
+        f" read-scan-rewrite {_milliseconds(before)}"
+        f" ({before / count * 1e6:.1f}us/drop),"
+        f" in-memory {_milliseconds(after)}"
+        f" ({after / count * 1e6:.1f}us/drop)"
+        f" ({before / after:.0f}x)"
+    ]
+
+
+def _percentiles(latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    return ", ".join(
+        f"{name} {latencies[int(fraction * (len(latencies) - 1))] * 1e6:.0f}us"
+        for name, fraction in (("p50", 0.5), ("p99", 0.99), ("max", 1))
+    )
+
+
+def latency(game: str) -> List[str]:
+    """
+    Time each drop logged from the hook path into an all-tags seed's tracker,
+    logging the hint and then the item of every location, so that every drop
+    changes the tracker. The hook only enqueues its writes for the tracker
+    worker; it is timed alongside waiting for them to be written, as when
+    the hook wrote synchronously, and reading, scanning and rewriting the
+    tracker file as it did originally.
+    """
+    from Mods.LootRandomizer.Mod import seed, tracker
+
+    seed.is_client = lambda: True
+
+    directory = tempfile.mkdtemp()
+    tracked_seed = _tracked_seed(directory)
+    session = [
+        (location, drop)
+        for drop in (False, True)
+        for location in tracked_seed.locations
+    ]
+
+    def read_scan_rewrite(location: Any, drop: bool) -> None:
+        _read_scan_rewrite(tracked_seed.tracker.path, location, drop)
+
+    def synchronous(location: Any, drop: bool) -> None:
+        tracked_seed.update_tracker(location, drop)
+        tracker.Flush()
+
+    hooks = (
+        ("read-scan-rewrite", read_scan_rewrite),
+        ("synchronous", synchronous),
+        ("write-behind", tracked_seed.update_tracker),
+    )
+
+    report = [f"{game}: {len(session)} drops logged from the hook path"]
+    for name, hook in hooks:
+        tracked_seed.tracker = None
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        tracked_seed.generate_tracker()
+        tracker.Flush()
+
+        latencies = []
+        for location, drop in session:
+            started = time.perf_counter()
+            hook(location, drop)
+            latencies.append(time.perf_counter() - started)
+        tracker.Flush()
+
+        report.append(f"  {name}: {_percentiles(latencies)}")
+    return report
+
+
+def populate(game: str) -> List[str]:
+    """
+    Time filling in the hints and the spoilers of a new all-tags seed's
+    tracker, in one pass over the tracker model's name index, and by
+    scanning the tracker's lines for each location as it was before. The
+    line comparisons made by the scan are counted, and the fill of a single
+    location class is timed on its own.
+    """
+    from Mods.LootRandomizer.Mod import seed, tracker
+    from Mods.LootRandomizer.Mod.missions import Mission
+
+    directory = tempfile.mkdtemp()
+    tracked_seed = _tracked_seed(directory)
+    path = os.path.join(tempfile.mkdtemp(), "tracker.txt")
+
+    def new_tracker() -> List[str]:
+        tracked_seed.tracker = None
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        tracked_seed.generate_tracker()
+        tracker.Flush()
+        return list(tracked_seed.tracker.lines)
+
+    def scan(lines: List[str], spoiler: bool) -> int:
+        comparisons = 0
+        for location, item in zip(tracked_seed.locations, tracked_seed.items):
+            none_log = f"{location}\n"
+            hint_log = f"{location} - {item.hint}\n"
+            full_log = f"{location} - {item.name}\n"
+
+            for index in range(len(lines)):
+                line = lines[index]
+                comparisons += 1
+
+                if line == full_log:
+                    break
+
+                if line in (none_log, hint_log):
+                    lines[index] = full_log if spoiler else hint_log
+                    break
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(lines)
+        return comparisons
+
+    report = [
+        f"{game}: {len(tracked_seed.locations)} locations,"
+        f" {len(new_tracker())} tracker lines"
+    ]
+    for name, spoiler in (("hints", False), ("spoilers", True)):
+        lines = new_tracker()
+        started = time.perf_counter()
+        comparisons = scan(lines, spoiler)
+        before = time.perf_counter() - started
+
+        new_tracker()
+        started = time.perf_counter()
+        tracked_seed.populate_tracker(spoiler)
+        tracker.Flush()
+        after = time.perf_counter() - started
+
+        names = tracked_seed.tracker._names
+        filled = [line for line in tracked_seed.tracker.lines if line in names]
+        if filled != [line for line in lines if line in names]:
+            raise AssertionError("Tracker differs from the scanned one")
+
+        new_tracker()
+        started = time.perf_counter()
+        tracked_seed.populate_tracker(spoiler, category=Mission)
+        tracker.Flush()
+        missions = time.perf_counter() - started
+
+        report.append(
+            f"  {name}: scan {_milliseconds(before)}"
+            f" ({comparisons} line comparisons),"
+            f" single pass {_milliseconds(after)}"
+            f" ({before / after:.0f}x),"
+            f" missions only {_milliseconds(missions)}"
+        )
+    return report
+
+
+def generate(game: str) -> List[str]:
+    """
+    Time generating new trackers for seeds with a growing number of content
+    tags, in a single streaming pass, and by scanning every location for
+    each content tag while building the text twice as it was before. The
+    single pass includes building the tracker model and writing its file.
+    """
+    from Mods.LootRandomizer.Mod import seed, tracker
+    from Mods.LootRandomizer.Mod.defines import ContentTags, Tag, TagList
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(tempfile.mkdtemp(), "tracker.txt")
+
+    def scan(tracked_seed: Any) -> str:
+        version_tags: Tag = tracked_seed.version_module.Tags
+
+        full_content = ""
+        with open(path, "w", encoding="utf-8") as file:
+            item_warning = (
+                " (not all accessible)"
+                if tracked_seed.item_count > len(tracked_seed.locations)
+                else ""
+            )
+
+            header = (
+                f"Loot Randomizer Seed {tracked_seed.string}\n\n"
+                f"Total locations: {len(tracked_seed.locations)}\n"
+                f"Total items: {tracked_seed.item_count}{item_warning}\n\n"
+            )
+            file.write(header)
+            full_content += header
+
+            for tag in TagList:
+                if tag not in version_tags:
+                    continue
+
+                caption = getattr(tag, "caption", None)
+                if caption:
+                    state = "On" if (tag in tracked_seed.tags) else "Off"
+                    file.write(f"{tag.caption}: {state}\n")
+                    full_content += f"{tag.caption}: {state}\n"
+
+            for tag in TagList:
+                if not tag & ContentTags & tracked_seed.tags:
+                    continue
+
+                locations = tuple(
+                    location
+                    for location in seed.Locations
+                    if tag in location.content
+                    and location in tracked_seed.locations
+                )
+                if not len(locations):
+                    continue
+
+                file.write(f"\n{tag.content_title}\n")
+                full_content += f"\n{tag.content_title}\n"
+
+                for location in locations:
+                    file.write(f"{location}\n")
+                    full_content += f"{location}\n"
+
+        return full_content
+
+    def stream(tracked_seed: Any) -> None:
+        tracked_seed.tracker = None
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        tracked_seed.generate_tracker()
+        tracker.Flush()
+
+    base_tags = Tag(2**36 - 1) & ~ContentTags
+    content_tags = [tag for tag in TagList if tag & ContentTags]
+
+    report = []
+    for step in range(1, 5):
+        tags = base_tags
+        for tag in content_tags[: len(content_tags) * step // 4]:
+            tags |= tag
+        tracked_seed = _tracked_seed(directory, tags)
+
+        before = _best(lambda: scan(tracked_seed))
+        after = _best(lambda: stream(tracked_seed))
+
+        expected = [line for line in scan(tracked_seed).splitlines() if line]
+        generated = [
+            line.rstrip("\n")
+            for line in tracked_seed.tracker.lines
+            if line.strip() and not line.startswith("Found: ")
+        ]
+        if generated != expected:
+            raise AssertionError("Tracker differs from the scanned one")
+
+        locations = len(tracked_seed.locations)
+        report.append(
+            f"{game}: {locations} locations,"
+            f" scan {_milliseconds(before)}"
+            f" ({before / locations * 1e6:.1f}us/location),"
+            f" single pass {_milliseconds(after)}"
+            f" ({after / locations * 1e6:.1f}us/location)"
+        )
+    return report
+
+
+def _import_times(game: str, statement: str) -> Tuple[float, float]:
+    """
+    Run the statement after preparing the given game in a fresh interpreter
+    with -X importtime, returning the total time spent importing and the part
+    of it spent importing requests, in seconds.
+    """
+    code = (
+        "import sys;"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r});"
+        f"import headless; headless.prepare({game!r});"
+        "import time; started = time.perf_counter();"
+        f"{statement};"
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        (sys.executable, "-X", "importtime", "-c", code),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    requests = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "requests":
+            requests = int(fields[1]) / 1e6
+    return float(result.stdout.split()[-1]), requests
+
+
+def imports(game: str, repeat: int = 5) -> List[str]:
+    """
+    Time importing the mod's options module, as the game does on startup,
+    with the vendored HTTP stack only imported on the first upload, and with
+    it imported along with the online tracker as it was before. Each import
+    is run in a fresh interpreter, and the fastest of several runs is kept.
+    """
+    eager = (
+        "from Mods.LootRandomizer.Mod import options, github;"
+        " github._ImportRequests()"
+    )
+    runs = (
+        ("imported with the tracker", eager),
+        (
+            "imported on first upload",
+            "from Mods.LootRandomizer.Mod import options",
+        ),
+    )
+
+    # Write the bytecode caches, as the game would have on a prior run.
+    _import_times(game, eager)
+
+    report = [f"{game}: importing the options module"]
+    for name, statement in runs:
+        total, requests = min(
+            _import_times(game, statement) for _ in range(repeat)
+        )
+        loaded = (
+            f"requests {_milliseconds(requests)}"
+            if requests
+            else "requests not loaded"
+        )
+        report.append(f"  {name}: {_milliseconds(total)}, {loaded}")
+    return report
+
+
+def ticks(game: str, count: int = 10000, per_tick: int = 10) -> List[str]:
+    """
+    Time scheduling callbacks for upcoming ticks and running them, through
+    the scheduler's single permanent tick hook, and with a hook registered
+    and removed for each call as it was before. Callbacks are scheduled a few
+    per tick, and every stand-in hook on Engine.Interaction.Tick is run each
+    tick as the game would. Routines passed to tick_while run for five ticks.
+    """
+    import unrealsdk
+    from Mods.LootRandomizer.Mod import defines
+
+    tick = "Engine.Interaction.Tick"
+
+    def hook_do_next_tick(*routines: Callable[[], None]) -> None:
+        if not routines:
+            return
+
+        def hook(caller: Any, _f: Any, params: Any) -> bool:
+            unrealsdk.RemoveHook(tick, f"LootRandomizer.{id(routines)}")
+            for routine in routines:
+                routine()
+            return True
+
+        unrealsdk.RunHook(tick, f"LootRandomizer.{id(routines)}", hook)
+
+    def hook_tick_while(routine: Callable[[], bool]) -> None:
+        if not routine():
+            return
+
+        def hook(caller: Any, _f: Any, params: Any) -> bool:
+            result = False
+            try:
+                result = routine()
+            finally:
+                if not result:
+                    unrealsdk.RemoveHook(tick, f"LootRandomizer.{id(routine)}")
+                return True
+
+        unrealsdk.RunHook(tick, f"LootRandomizer.{id(routine)}", hook)
+
+    ran = 0
+
+    def callback() -> None:
+        nonlocal ran
+        ran += 1
+
+    def repeating() -> Callable[[], bool]:
+        remaining = 5
+
+        def routine() -> bool:
+            nonlocal ran, remaining
+            ran += 1
+            remaining -= 1
+            return remaining > 0
+
+        return routine
+
+    def run_ticks(
+        schedule: Callable[[Any], None], routines: List[Callable[[], Any]]
+    ) -> int:
+        """Run ticks until every routine is done, returning the most hooks."""
+        nonlocal ran
+        ran = 0
+        runs = len(routines) * (5 if routines[0] is not callback else 1)
+        most_hooks = 0
+        while ran < runs:
+            for routine in routines[-per_tick:]:
+                schedule(routine)
+            del routines[-per_tick:]
+
+            hooks = [
+                hook
+                for (function, _), hook in unrealsdk.Hooks.items()
+                if function == tick
+            ]
+            most_hooks = max(most_hooks, len(hooks))
+            for hook in hooks:
+                hook(None, None, None)
+        return most_hooks
+
+    # Install the scheduler's hook, as the mod does when enabled.
+    defines.Enable()
+
+    variants: Sequence[Tuple[str, Callable[[], Any], Callable[..., None]]]
+    variants = (
+        ("do_next_tick, hook per call", lambda: callback, hook_do_next_tick),
+        ("do_next_tick, scheduler", lambda: callback, defines.do_next_tick),
+        ("tick_while, hook per call", repeating, hook_tick_while),
+        ("tick_while, scheduler", repeating, defines.tick_while),
+    )
+
+    report = []
+    for name, routine, schedule in variants:
+        most_hooks: List[int] = []
+        timing = _best(
+            lambda: most_hooks.append(
+                run_ticks(schedule, [routine() for _ in range(count)])
+            )
+        )
+        report.append(
+            f"{game} {name}: {count} callbacks in {_milliseconds(timing)},"
+            f" at most {max(most_hooks)} tick hooks"
+        )
+    return report
+
+
+class _CountedFile:
+    """Proxy for an open file, counting the bytes written through it."""
+
+    def __init__(self, file: Any, counts: Dict[str, int]) -> None:
+        self._file = file
+        self._counts = counts
+
+    def __enter__(self) -> _CountedFile:
+        self._file.__enter__()
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self._file.__exit__(*exception)
+
+    def __iter__(self) -> Any:
+        return iter(self._file)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def write(self, data: Any) -> int:
+        self._counts["bytes written"] += len(data)
+        return self._file.write(data)
+
+    def writelines(self, lines: Sequence[Any]) -> None:
+        for line in lines:
+            self.write(line)
+
+
+def _counting_io(counts: Dict[str, int]) -> Callable[[], None]:
+    """
+    Count file opens for reading and for writing, and the bytes written
+    through them or patched in place, until the returned function is called.
+    """
+    import builtins, mmap
+
+    from Mods.LootRandomizer.Mod import tracker
+
+    original_open = builtins.open
+    original_mmap = tracker.mmap.mmap
+
+    def counted_open(file: Any, mode: str = "r", *args: Any, **kwargs: Any):
+        counted = original_open(file, mode, *args, **kwargs)
+        if any(flag in mode for flag in "wa+"):
+            counts["write opens"] += 1
+            return _CountedFile(counted, counts)
+        counts["read opens"] += 1
+        return counted
+
+    class CountedMap(mmap.mmap):
+        def __setitem__(self, index: Any, data: Any) -> None:
+            counts["bytes written"] += len(data)
+            super().__setitem__(index, data)
+
+    builtins.open = counted_open  # type: ignore
+    tracker.mmap.mmap = CountedMap  # type: ignore
+
+    def restore() -> None:
+        builtins.open = original_open
+        tracker.mmap.mmap = original_mmap  # type: ignore
+
+    return restore
+
+
+def io(game: str, runs: int = 100) -> List[str]:
+    """
+    Count the file I/O of a simulated farm session: repeatedly killing a
+    handful of enemies, logging their hints and occasionally their items,
+    with a map change after each run. The journaled tracker, in both layouts,
+    is counted alongside reading and rewriting the tracker for each drop.
+    """
+    from Mods.LootRandomizer.Mod import options, seed, tracker
+
+    seed.is_client = lambda: True
+
+    directory = tempfile.mkdtemp()
+    tracked_seed = _tracked_seed(directory)
+    randomizer = random.Random(0)
+    farmed = randomizer.sample(tracked_seed.locations, 5)
+    session = [
+        [(location, randomizer.random() < 0.05) for location in farmed]
+        for _ in range(runs)
+    ]
+
+    def before() -> Callable[[], None]:
+        tracked_seed.generate_tracker()
+        tracker.Flush()
+        path = tracked_seed.tracker.path
+
+        def session_io() -> None:
+            for kills in session:
+                for location, drop in kills:
+                    _read_scan_rewrite(path, location, drop)
+
+        return session_io
+
+    def after(fixed_width: bool) -> Callable[[], Callable[[], None]]:
+        def prepare() -> Callable[[], None]:
+            options.FixedWidthTracker.CurrentValue = fixed_width
+            tracked_seed.generate_tracker()
+            tracker.Flush()
+
+            def session_io() -> None:
+                for kills in session:
+                    for location, drop in kills:
+                        tracked_seed.update_tracker(location, drop)
+                    tracked_seed.compact_tracker()
+                tracker.Flush()
+
+            return session_io
+
+        return prepare
+
+    sessions = (
+        ("read-scan-rewrite", before),
+        ("journal", after(False)),
+        ("journal fixed-width", after(True)),
+    )
+
+    report = [
+        f"{game}: {runs} runs killing {len(farmed)} enemies,"
+        f" {runs * len(farmed)} drops"
+    ]
+    for name, prepare in sessions:
+        # Start each session from a new tracker.
+        tracked_seed.tracker = None
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        session_io = prepare()
+
+        counts = collections.Counter(
+            {"read opens": 0, "write opens": 0, "bytes written": 0}
+        )
+        restore = _counting_io(counts)
+        try:
+            session_io()
+        finally:
+            restore()
+
+        report.append(
+            f"  {name}: "
+            + ", ".join(f"{count} {what}" for what, count in counts.items())
+        )
+    return report
+
+
+Benchmarks = {
+    "apply": apply,
+    "manifest": manifest,
+    "drops": drops,
+    "io": io,
+    "latency": latency,
+    "populate": populate,
+    "generate": generate,
+    "imports": imports,
+    "ticks": ticks,
+}
+
+
+def _run(arguments: Tuple[str, str, Sequence[Any]]) -> List[str]:
+    name, game, extra = arguments
+    headless.prepare(game)
+    return Benchmarks[name](game, *extra)
+
+
+def run(name: str, game: str, *extra: Any) -> List[str]:
+    """Run the named benchmark for the given game in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_run, ((name, game, extra),))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark Loot Randomizer's hot paths without the game."
+    )
+    parser.add_argument("benchmark", choices=tuple(Benchmarks))
+    parser.add_argument(
+        "--game",
+        choices=("bl2", "tps"),
+        action="append",
+        help="Game to benchmark; may be specified twice (default: both).",
+    )
+    args = parser.parse_args(argv)
+
+    for game in args.game or ("bl2", "tps"):
+        for line in run(args.benchmark, game):
+            print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
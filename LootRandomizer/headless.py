@@ -0,0 +1,142 @@
+"""
+Headless seed generation for Loot Randomizer.
+
+Computes seed assignments outside of the game, using the mod's location and
+item tables along with the stand-in unrealsdk and ModMenu modules bundled in
+the Headless directory. Example usage:
+
+    python headless.py --game bl2 --count 1000 --processes 8 > seeds.jsonl
+    python headless.py --game tps --seed abcde-fghij-klmno
+"""
+
+from __future__ import annotations
+
+import argparse, json, multiprocessing, os, sys
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+_headless_dir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Headless"
+)
+
+
+def prepare(game: str) -> None:
+    """
+    Select the game to emulate, and make the stand-in SDK modules importable.
+    Must be called before importing anything from Mods.LootRandomizer.
+    """
+    os.environ["LOOTRANDOMIZER_GAME"] = game
+    if _headless_dir not in sys.path:
+        sys.path.insert(0, _headless_dir)
+
+
+def parse_tags(names: Sequence[str]) -> int:
+    from Mods.LootRandomizer.Mod.defines import Tag, TagList
+
+    if not names:
+        return sum(tag.value for tag in TagList if tag.default)
+
+    tags = 0
+    for name in names:
+        if name == "all":
+            tags |= sum(tag.value for tag in TagList)
+        elif name not in Tag.__members__:
+            raise ValueError(f"Unknown tag '{name}'")
+        else:
+            tags |= Tag[name].value
+    return tags
+
+
+def generate(tags: int, count: int) -> List[str]:
+    from Mods.LootRandomizer.Mod.defines import Tag
+    from Mods.LootRandomizer.Mod.seed import Seed
+
+    return [Seed.Generate(Tag(tags)).string for _ in range(count)]
+
+
+def assign(seed_string: str) -> Dict[str, Any]:
+    """
+    Compute the location and item assignment for the given seed, exactly as
+    Seed.apply would in game.
+    """
+    from Mods.LootRandomizer.Mod.defines import SupportedVersions
+    from Mods.LootRandomizer.Mod.seed import Seed, load_seedversion
+
+    seed = Seed.FromString(seed_string)
+    if seed.version not in SupportedVersions:
+        raise ValueError(f"Unsupported version for seed {seed.string}")
+
+    seed.version_module = load_seedversion(seed.version)
+    seed.assign()
+
+    return {
+        "seed": seed.string,
+        "version": seed.version,
+        "item_count": seed.item_count,
+        "locations": [
+            [str(location), item.name]
+            for location, item in zip(seed.locations, seed.items)
+        ],
+    }
+
+
+def run(
+    game: str,
+    seed_strings: Iterable[str],
+    processes: Optional[int] = None,
+    chunksize: int = 16,
+) -> Iterable[Dict[str, Any]]:
+    """
+    Compute the assignments for the given seeds across a process pool,
+    yielding each in order as it is completed.
+    """
+    with multiprocessing.Pool(processes, prepare, (game,)) as pool:
+        yield from pool.imap(assign, seed_strings, chunksize)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate and dump Loot Randomizer seeds without the game."
+    )
+    parser.add_argument("--game", choices=("bl2", "tps"), default="bl2")
+    parser.add_argument(
+        "--seed",
+        action="append",
+        default=[],
+        help="Seed string to dump; may be specified multiple times.",
+    )
+    parser.add_argument(
+        "--count", type=int, default=0, help="Number of new seeds to generate."
+    )
+    parser.add_argument(
+        "--tags",
+        nargs="*",
+        default=(),
+        help='Tag names for generated seeds, or "all" (default: default tags).',
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument(
+        "--output", help="File to write JSON lines to (default: stdout)."
+    )
+    args = parser.parse_args(argv)
+
+    prepare(args.game)
+
+    seed_strings = list(args.seed)
+    if args.count:
+        seed_strings += generate(parse_tags(args.tags), args.count)
+
+    output = sys.stdout
+    if args.output:
+        output = open(args.output, "w", encoding="utf-8")
+    try:
+        for result in run(args.game, seed_strings, args.processes):
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Constrained seed search for Loot Randomizer.
+
+Searches the 30-bit seed value space for seeds whose assignment satisfies a
+set of constraints, streaming matching seed strings as they are found.
+Example usage:
+
+    python seedsearch.py --game bl2 --item-at "Norfleet=Enemy: Knuckle Dragger"
+    python seedsearch.py --item-in "Conference Call=ShortMission" \\
+        --max-duds Raid=0 --limit 5 --processes 8
+
+Constraints:
+    --item-at ITEM=LOCATION   ITEM is assigned to LOCATION.
+    --item-in ITEM=TAG        ITEM is assigned to any location with TAG (a
+                              content tag, or a location tag like Raid).
+    --max-duds CATEGORY=N     At most N locations in CATEGORY get no item.
+                              CATEGORY is a tag, or Enemy, Mission or Other.
+"""
+
+from __future__ import annotations
+
+import argparse, multiprocessing, random, sys, time
+
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import headless
+
+
+Constraint = Callable[[Sequence[int]], bool]
+
+_kernel: AssignmentKernel
+_constraints: Sequence[Constraint]
+
+
+class AssignmentKernel:
+    """
+    Reproduces Seed.assign for a fixed tag set and version, for any seed
+    value. The tag filtering is done once, so each candidate only costs the
+    seeded shuffle or sample, which is performed on item indexes rather than
+    ItemPool objects. The resulting permutation is identical since it only
+    depends on the random state and list length.
+    """
+
+    tags: int
+    version: int
+    duplicate_items: bool
+
+    item_names: Sequence[str]
+    location_names: Sequence[str]
+    location_tags: Sequence[int]
+    location_categories: Sequence[str]
+
+    def __init__(self, tags: int, version: int) -> None:
+        from Mods.LootRandomizer.Mod.defines import Tag
+        from Mods.LootRandomizer.Mod.seed import load_seedversion
+
+        self.tags = tags
+        self.version = version
+        self.duplicate_items = bool(tags & Tag.DuplicateItems)
+
+        version_module = load_seedversion(version)
+
+        self.item_names = [
+            entry.name for entry in version_module.Items if entry.tags & tags
+        ]
+
+        locations = [
+            entry
+            for entry in version_module.Locations
+            if entry.tags in Tag(tags)
+        ]
+        self.location_names = [entry.name for entry in locations]
+        self.location_tags = [int(entry.tags) for entry in locations]
+        self.location_categories = [
+            entry.name.split(":", 1)[0] for entry in locations
+        ]
+
+    def data(self, value: int) -> bytes:
+        value = (value << 42) | (self.tags << 6) | self.version
+        return value.to_bytes(length=9, byteorder="big")
+
+    def assign(self, value: int) -> List[int]:
+        """
+        Return the index of the item assigned to each location for the given
+        seed value, or -1 for locations that receive no item.
+        """
+        location_count = len(self.location_names)
+        item_count = len(self.item_names)
+
+        randomizer = random.Random(self.data(value))
+        assignment = list(range(item_count))
+
+        if location_count < item_count:
+            assignment = randomizer.sample(assignment, location_count)
+
+        elif location_count == item_count:
+            randomizer.shuffle(assignment)
+
+        elif self.duplicate_items:
+            assignment *= location_count // item_count
+            assignment += randomizer.sample(
+                assignment, location_count % item_count
+            )
+            randomizer.shuffle(assignment)
+
+        else:
+            assignment += [-1] * (location_count - item_count)
+            randomizer.shuffle(assignment)
+
+        return assignment
+
+
+def _split(argument: str) -> Tuple[str, str]:
+    name, _, value = argument.rpartition("=")
+    if not name:
+        raise ValueError(f"Expected NAME=VALUE, got '{argument}'")
+    return name.strip(), value.strip()
+
+
+def _item_index(kernel: AssignmentKernel, name: str) -> int:
+    try:
+        return kernel.item_names.index(name)
+    except ValueError:
+        raise ValueError(f"Item '{name}' is not included in searched seeds")
+
+
+def _locations_matching(kernel: AssignmentKernel, category: str) -> List[int]:
+    from Mods.LootRandomizer.Mod.defines import Tag
+
+    if category in ("Enemy", "Mission", "Other"):
+        categories = kernel.location_categories
+        return [
+            index
+            for index, location_category in enumerate(categories)
+            if location_category == category
+        ]
+
+    if category not in Tag.__members__:
+        raise ValueError(f"Unknown tag or category '{category}'")
+
+    tag = Tag[category].value
+    return [
+        index
+        for index, location_tags in enumerate(kernel.location_tags)
+        if location_tags & tag
+    ]
+
+
+def compile_constraints(
+    kernel: AssignmentKernel,
+    item_at: Sequence[str],
+    item_in: Sequence[str],
+    max_duds: Sequence[str],
+) -> List[Constraint]:
+    constraints: List[Constraint] = []
+
+    for argument in item_at:
+        item_name, location_name = _split(argument)
+        item = _item_index(kernel, item_name)
+        try:
+            location = kernel.location_names.index(location_name)
+        except ValueError:
+            raise ValueError(
+                f"Location '{location_name}' is not included in searched seeds"
+            )
+
+        def has_item_at(
+            assignment: Sequence[int],
+            item: int = item,
+            location: int = location,
+        ) -> bool:
+            return assignment[location] == item
+
+        constraints.append(has_item_at)
+
+    for argument in item_in:
+        item_name, category = _split(argument)
+        item = _item_index(kernel, item_name)
+        matching = _locations_matching(kernel, category)
+        if not matching:
+            raise ValueError(
+                f"No locations with '{category}' are included in searched seeds"
+            )
+
+        def has_item_in(
+            assignment: Sequence[int],
+            item: int = item,
+            matching: Sequence[int] = matching,
+        ) -> bool:
+            for location in matching:
+                if assignment[location] == item:
+                    return True
+            return False
+
+        constraints.append(has_item_in)
+
+    for argument in max_duds:
+        category, count = _split(argument)
+        maximum = int(count)
+        matching = _locations_matching(kernel, category)
+
+        def within_max_duds(
+            assignment: Sequence[int],
+            matching: Sequence[int] = matching,
+            maximum: int = maximum,
+        ) -> bool:
+            duds = 0
+            for location in matching:
+                if assignment[location] == -1:
+                    duds += 1
+                    if duds > maximum:
+                        return False
+            return True
+
+        constraints.append(within_max_duds)
+
+    return constraints
+
+
+def _initialize(
+    game: str,
+    tags: int,
+    version: int,
+    item_at: Sequence[str],
+    item_in: Sequence[str],
+    max_duds: Sequence[str],
+) -> None:
+    global _kernel, _constraints
+    headless.prepare(game)
+    _kernel = AssignmentKernel(tags, version)
+    _constraints = compile_constraints(_kernel, item_at, item_in, max_duds)
+
+
+def _search_range(bounds: Tuple[int, int]) -> Tuple[int, List[str]]:
+    from Mods.LootRandomizer.Mod.defines import Tag
+    from Mods.LootRandomizer.Mod.seed import Seed
+
+    matches: List[str] = []
+    for value in range(*bounds):
+        if not value:
+            continue
+        assignment = _kernel.assign(value)
+        for constraint in _constraints:
+            if not constraint(assignment):
+                break
+        else:
+            seed = Seed.Generate(Tag(_kernel.tags), _kernel.version, value)
+            matches.append(seed.string)
+
+    return bounds[1] - bounds[0], matches
+
+
+def _ranges(start: int, chunk: int) -> Iterator[Tuple[int, int]]:
+    space = 2**30
+    offset = 0
+    while offset < space:
+        low = (start + offset) % space
+        high = min(low + chunk, space, low + space - offset)
+        yield low, high
+        offset += high - low
+
+
+def search(
+    game: str,
+    tags: int,
+    version: int,
+    item_at: Sequence[str] = (),
+    item_in: Sequence[str] = (),
+    max_duds: Sequence[str] = (),
+    processes: Optional[int] = None,
+    start: int = 0,
+    chunk: int = 2000,
+) -> Iterator[Tuple[str, int, float]]:
+    """
+    Search the seed space starting at the given seed value, yielding each
+    matching seed string along with the number of candidates searched so far
+    and the throughput in seeds per second.
+    """
+    initargs = (game, tags, version, item_at, item_in, max_duds)
+
+    # Validate the constraints before spinning up the pool.
+    _initialize(*initargs)
+
+    started = time.perf_counter()
+    searched = 0
+
+    with multiprocessing.Pool(processes, _initialize, initargs) as pool:
+        for count, matches in pool.imap_unordered(
+            _search_range, _ranges(start, chunk)
+        ):
+            searched += count
+            rate = searched / max(time.perf_counter() - started, 1e-9)
+            for match in matches:
+                yield match, searched, rate
+            if not matches:
+                yield "", searched, rate
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Search for Loot Randomizer seeds matching constraints."
+    )
+    parser.add_argument("--game", choices=("bl2", "tps"), default="bl2")
+    parser.add_argument(
+        "--tags",
+        nargs="*",
+        default=(),
+        help='Tag names for searched seeds, or "all" (default: default tags).',
+    )
+    parser.add_argument("--version", type=int, default=None)
+    parser.add_argument("--item-at", action="append", default=[])
+    parser.add_argument("--item-in", action="append", default=[])
+    parser.add_argument("--max-duds", action="append", default=[])
+    parser.add_argument(
+        "--limit", type=int, default=0, help="Stop after this many matches."
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        default=None,
+        help="Seed value to start at (default: random).",
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    headless.prepare(args.game)
+    from Mods.LootRandomizer.Mod.defines import CurrentVersion
+
+    tags = headless.parse_tags(args.tags)
+    version = args.version if args.version is not None else CurrentVersion
+    start = args.start if args.start is not None else random.getrandbits(30)
+
+    found = 0
+    reported = time.perf_counter()
+
+    for match, searched, rate in search(
+        args.game,
+        tags,
+        version,
+        args.item_at,
+        args.item_in,
+        args.max_duds,
+        args.processes,
+        start,
+    ):
+        if match:
+            print(match, flush=True)
+            found += 1
+            if args.limit and found >= args.limit:
+                break
+
+        now = time.perf_counter()
+        if now - reported >= 1:
+            reported = now
+            print(
+                f"{searched} searched, {found} found, {rate:.0f} seeds/s",
+                file=sys.stderr,
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
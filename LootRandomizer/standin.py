@@ -0,0 +1,499 @@
+"""
+Local stand-in for the online tracker's publishing endpoints.
+
+Serves an in-memory imitation of the Github Gist API under /gists, and a
+webhook accepting PUT or POST requests under any other path, so that the
+online tracker can be exercised without a Github account or network access.
+Example usage:
+
+    python standin.py --port 8080
+    python standin.py --benchmark 500 --backend "Webhook PUT"
+    python standin.py --latency 200
+    python standin.py --fail 3 --failure drop
+
+The benchmark runs the mod's uploader headlessly against the stand-in,
+publishing a tracker update for each of the given number of drops, and
+reports the requests and bytes sent and the throughput, both when waiting
+for each upload, with the tracker sent whole or sharded by section, and when
+letting the uploader coalesce drops. The latency benchmark
+serves the stand-in over HTTPS, with a self-signed certificate made by the
+openssl command unless one is given, and times each upload with pooled
+connections and with a new connection for each upload.
+
+The stand-in can also fail requests on purpose, so that the uploader's
+retries and outbox can be exercised. Each failing request is either answered
+with a 503 error, or has its connection dropped without any response.
+"""
+
+from __future__ import annotations
+
+import argparse, json, os, ssl, subprocess, sys, tempfile, threading, time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import headless
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    gists: Dict[str, Dict[str, Any]]
+    hooks: Dict[str, Any]
+    requests: int
+    bytes_received: int
+    last_body: Any
+    rate_limit: int
+    remaining: int
+    reset_time: int
+    verbose: bool
+
+    # Requests left to fail on purpose, and how; "error" or "drop".
+    failures: int
+    failure: str
+
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        port: int = 0,
+        rate_limit: int = 5000,
+        verbose: bool = False,
+        context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        if context:
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+        self.gists = dict()
+        self.hooks = dict()
+        self.requests = 0
+        self.bytes_received = 0
+        self.last_body = None
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_time = int(time.time()) + 3600
+        self.verbose = verbose
+        self.failures = 0
+        self.failure = "error"
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if isinstance(self.socket, ssl.SSLSocket) else "http"
+        return f"{scheme}://127.0.0.1:{self.server_port}"
+
+    def start(self) -> None:
+        threading.Thread(
+            target=self.serve_forever, name="StandInServer", daemon=True
+        ).start()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StandInServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, status: int, body: Any = None) -> None:
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.path.startswith("/gists"):
+            remaining = str(self.server.remaining)
+            self.send_header("X-RateLimit-Remaining", remaining)
+            self.send_header("X-RateLimit-Reset", str(self.server.reset_time))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _handle(self) -> None:
+        server = self.server
+        try:
+            body = self._body()
+        except ValueError:
+            self._respond(400, {"message": "Problems parsing JSON"})
+            return
+
+        with server._lock:
+            server.requests += 1
+            server.bytes_received += int(self.headers.get("Content-Length", 0))
+            server.last_body = body
+            if server.failures > 0:
+                server.failures -= 1
+                if server.failure == "drop":
+                    self.close_connection = True
+                else:
+                    self._respond(503, {"message": "Service Unavailable"})
+            elif self.path.startswith("/gists"):
+                if server.remaining <= 0:
+                    self._respond(403, {"message": "Rate limit exceeded"})
+                    return
+                server.remaining -= 1
+                self._gist(body)
+            else:
+                server.hooks[self.path] = body
+                self._respond(200, {})
+
+    def _gist(self, body: Any) -> None:
+        gists = self.server.gists
+        gist_id = self.path[len("/gists") :].strip("/")
+
+        if self.command == "POST" and not gist_id:
+            gist_id = f"{len(gists) + 1:032x}"
+            gists[gist_id] = dict()
+            status = 201
+        elif self.command == "PATCH" and gist_id in gists:
+            status = 200
+        else:
+            self._respond(404, {"message": "Not Found"})
+            return
+
+        files = gists[gist_id]
+        for file_name, file in body.get("files", {}).items():
+            if file.get("content"):
+                files[file_name] = file["content"]
+            else:
+                files.pop(file_name, None)
+
+        self._respond(
+            status,
+            {
+                "id": gist_id,
+                "html_url": f"{self.server.url}/gists/{gist_id}",
+                "description": body.get("description"),
+                "files": {
+                    file_name: {"content": content}
+                    for file_name, content in files.items()
+                },
+            },
+        )
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server._lock:
+            if self.path.startswith("/gists/"):
+                gist = server.gists.get(self.path[len("/gists/") :])
+                if gist is None:
+                    self._respond(404, {"message": "Not Found"})
+                else:
+                    self._respond(200, {"files": gist})
+            elif self.path in server.hooks:
+                self._respond(200, server.hooks[self.path])
+            else:
+                self._respond(404, {"message": "Not Found"})
+
+    do_POST = do_PUT = do_PATCH = _handle
+
+
+def _publish_drops(
+    server: StandInServer,
+    backend: str,
+    drops: int,
+    sections: int,
+    wait: bool,
+    sharded: bool,
+) -> float:
+    """
+    Publish a tracker update for each simulated drop through the mod's
+    uploader, optionally waiting for each upload before the next drop, and
+    return the seconds taken until everything was published. Unless sharded,
+    the sections are published as a single file, as the whole tracker was.
+    """
+    from Mods.LootRandomizer.Mod import github, options, tracker
+
+    github.GithubGistApi = f"{server.url}/gists"
+    options.UploadedDigests.CurrentValue = dict()
+    options.GistId.CurrentValue = ""
+    options.LastSeed.CurrentValue = ""
+
+    directory = tempfile.mkdtemp()
+    if backend == "Directory":
+        options.TrackerDestination.CurrentValue = directory
+    else:
+        options.TrackerDestination.CurrentValue = f"{server.url}/tracker"
+
+    seed = "abcde-fghij-klmno"
+    lines: List[List[str]] = [
+        [f"Enemy: Location {section}-{index}\n" for index in range(60)]
+        for section in range(sections)
+    ]
+
+    started = time.perf_counter()
+    for drop in range(drops):
+        section_lines = lines[drop % sections]
+        index = (drop // sections) % len(section_lines)
+        section_lines[index] = f"Enemy: Location {drop} - Item {drop}\n"
+
+        shards = [
+            (f"Section {section}", "".join(section_lines))
+            for section, section_lines in enumerate(lines)
+        ]
+        if not sharded:
+            shards = [("Tracker", "".join(content for _, content in shards))]
+
+        github.update(
+            seed, f"Loot Randomizer Seed {seed}\n\nFound: {drop + 1}\n", shards
+        )
+        if wait:
+            github._uploader.flush()
+    github._uploader.flush()
+    tracker.Flush()
+    elapsed = time.perf_counter() - started
+
+    github.Close()
+
+    if backend == "Github Gist":
+        published = next(iter(server.gists.values()))
+    elif backend == "Directory":
+        published = {
+            file_name[:-4]: open(os.path.join(directory, file_name)).read()
+            for file_name in os.listdir(directory)
+            if file_name.endswith(".txt")
+        }
+    else:
+        published = server.hooks["/tracker"]["files"]
+    header = f"Loot Randomizer Seed {seed}\n\nFound: {drops}\n"
+    if published.get(seed) != header:
+        print("Published tracker does not match the last update")
+
+    return elapsed
+
+
+def benchmark(backend: str, drops: int, sections: int = 8) -> None:
+    """
+    Publish a tracker update for each simulated drop through the mod's
+    uploader, with its upload spacing disabled and an unlimited stand-in rate
+    limit, and report the requests and bytes sent and the throughput.
+    The drops are first published waiting for each upload before the next
+    drop, so that every drop costs a request, both with the whole tracker as
+    one file and sharded by section. They are then published sharded as fast
+    as they come, so that the uploader coalesces drops arriving during an
+    upload.
+    """
+    from Mods.LootRandomizer.Mod import github, options
+
+    github.outbox_dir = os.path.join(tempfile.mkdtemp(), "Outbox")
+    github._uploader.min_interval = 0
+
+    options.SaveSettings = lambda: None
+    options.OnlineTrackerBackend.CurrentValue = backend
+    options.GithubToken.CurrentValue = "stand-in"
+
+    runs = (
+        ("whole tracker, waiting for each upload", True, False),
+        ("sharded, waiting for each upload", True, True),
+        ("sharded, coalesced", False, True),
+    )
+    for name, wait, sharded in runs:
+        server = StandInServer(rate_limit=2**40)
+        server.start()
+        try:
+            elapsed = _publish_drops(
+                server, backend, drops, sections, wait, sharded
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        average = server.bytes_received / max(server.requests, 1)
+        print(
+            f"{backend}, {name}: {drops} drops published in {elapsed:.2f}s"
+            f" ({drops / elapsed:.0f} drops/s),"
+            f" {server.requests} requests received,"
+            f" {server.bytes_received} bytes ({average:.0f} per request)"
+        )
+
+
+def self_signed_certificate(directory: str) -> Tuple[str, str]:
+    """
+    Create a self-signed certificate for 127.0.0.1 in the given directory,
+    using the openssl command, and return the paths to it and to its key.
+    """
+    certfile = os.path.join(directory, "standin.pem")
+    keyfile = os.path.join(directory, "standin.key")
+    subprocess.run(
+        (
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-days", "1", "-subj", "/CN=127.0.0.1",
+            "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", keyfile, "-out", certfile,
+        ),
+        check=True,
+        capture_output=True,
+    )
+    return certfile, keyfile
+
+
+def latency(
+    backend: str, uploads: int, certfile: str, keyfile: str, sections: int = 8
+) -> None:
+    """
+    Time each tracker upload through the mod's uploader against the stand-in
+    served over HTTPS, using the uploader's pooled session, and with a new
+    session for each upload so that each pays for its own TCP and TLS
+    handshakes, as uploads did before sessions were pooled.
+    """
+    from Mods.LootRandomizer.Mod import github, options
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    server = StandInServer(rate_limit=2**40, context=context)
+    server.start()
+
+    github.outbox_dir = os.path.join(tempfile.mkdtemp(), "Outbox")
+    github.GithubGistApi = f"{server.url}/gists"
+    github._uploader.min_interval = 0
+
+    get_session = github._GetSession
+
+    def trusting_session() -> Any:
+        # Ignore the environment, whose CA bundle would override our own.
+        session = get_session()
+        session.trust_env = False
+        session.verify = certfile
+        return session
+
+    github._GetSession = trusting_session
+
+    options.SaveSettings = lambda: None
+    options.OnlineTrackerBackend.CurrentValue = backend
+    options.GithubToken.CurrentValue = "stand-in"
+    options.TrackerDestination.CurrentValue = f"{server.url}/tracker"
+    options.UploadedDigests.CurrentValue = dict()
+    options.GistId.CurrentValue = ""
+    options.LastSeed.CurrentValue = ""
+
+    seed = "abcde-fghij-klmno"
+    content = [
+        (
+            f"Section {section}",
+            "".join(
+                f"Enemy: Location {section}-{index}\n" for index in range(60)
+            ),
+        )
+        for section in range(sections)
+    ]
+
+    upload = 0
+    for name, pooled in (("new connections", False), ("pooled", True)):
+        timings = []
+        for _ in range(uploads):
+            upload += 1
+            started = time.perf_counter()
+            github.update(
+                seed,
+                f"Loot Randomizer Seed {seed}\n\nFound: {upload}\n",
+                content,
+            )
+            github._uploader.flush()
+            timings.append(time.perf_counter() - started)
+            if not pooled:
+                github.Close()
+        github.Close()
+
+        timings.sort()
+        print(
+            f"{backend} over HTTPS, {name}: {uploads} uploads,"
+            f" median {timings[len(timings) // 2] * 1000:.2f}ms,"
+            f" mean {sum(timings) / len(timings) * 1000:.2f}ms per upload"
+        )
+
+    server.shutdown()
+    server.server_close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Stand in for the Loot Randomizer online tracker."
+    )
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=5000,
+        help="Gist API requests allowed before responding 403.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        default=0,
+        metavar="DROPS",
+        help="Benchmark the uploader with this many drops, then exit.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=int,
+        default=0,
+        metavar="UPLOADS",
+        help="Time this many uploads over HTTPS, then exit.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("Github Gist", "Webhook PUT", "Webhook POST", "Directory"),
+        default="Github Gist",
+    )
+    parser.add_argument("--game", choices=("bl2", "tps"), default="bl2")
+    parser.add_argument(
+        "--certfile",
+        help="Serve HTTPS with this certificate (default: self-signed"
+        " with --latency, otherwise HTTP).",
+    )
+    parser.add_argument("--keyfile", help="Private key for --certfile.")
+    parser.add_argument(
+        "--fail",
+        type=int,
+        default=0,
+        metavar="REQUESTS",
+        help="Fail this many requests on purpose before serving any.",
+    )
+    parser.add_argument(
+        "--failure",
+        choices=("error", "drop"),
+        default="error",
+        help="Respond 503 to failed requests, or drop their connection.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.latency and args.backend == "Directory":
+        parser.error("--latency requires a network backend")
+
+    certfile, keyfile = args.certfile, args.keyfile
+    if args.latency and not certfile:
+        certfile, keyfile = self_signed_certificate(tempfile.mkdtemp())
+
+    if args.benchmark or args.latency:
+        headless.prepare(args.game)
+        if args.benchmark:
+            benchmark(args.backend, args.benchmark)
+        if args.latency:
+            latency(args.backend, args.latency, certfile, keyfile)
+        return
+
+    context = None
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+
+    server = StandInServer(
+        args.port, args.rate_limit, verbose=True, context=context
+    )
+    server.failures = args.fail
+    server.failure = args.failure
+    print(f"Serving on {server.url}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
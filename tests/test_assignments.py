@@ -0,0 +1,101 @@
+"""
+Checks that seed assignments restored from the on-disk cache are exactly
+those computed by a cold apply. Each game runs headlessly in a fresh
+process, as the mod's tables are chosen at import time.
+"""
+
+from __future__ import annotations
+
+import multiprocessing, os, sys, tempfile, unittest
+
+from typing import Any, List, Tuple
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "LootRandomizer",
+    ),
+)
+
+import headless
+
+
+def _assignment(seed: Any) -> Tuple[Any, ...]:
+    from Mods.LootRandomizer.Mod import seed as seed_module
+
+    return (
+        tuple(seed.locations),
+        tuple(seed.items),
+        seed.item_count,
+        tuple(
+            (item, tuple(item.applied_items))
+            for item in seed_module.Items
+            if item in seed.items
+        ),
+    )
+
+
+def _compare(game: str) -> List[str]:
+    """
+    Apply seeds of every supported version and several tag sets cold, then
+    from the cache, returning a description of each mismatch.
+    """
+    headless.prepare(game)
+    from Mods.LootRandomizer.Mod import seed
+    from Mods.LootRandomizer.Mod.defines import SupportedVersions, Tag, TagList
+
+    seed.assignments_dir = tempfile.mkdtemp()
+
+    default_tags = Tag(sum(tag.value for tag in TagList if tag.default))
+    base_game = Tag.BaseGame | Tag.ShortMission | Tag.UniqueEnemy
+    tag_sets = (default_tags, Tag(2**36 - 1), base_game)
+
+    failures: List[str] = []
+    for version in SupportedVersions:
+        for tags in tag_sets:
+            for value in (1, 12345, 2**30 - 1):
+                cold = seed.Seed.Generate(tags, version, value)
+                cold.version_module = seed.load_seedversion(version)
+                if cold.load_assignment():
+                    failures.append(f"{cold.string} was cached before apply")
+                cold.assign()
+                cold.save_assignment()
+                expected = _assignment(cold)
+
+                # Forget what the cold apply left on the item pools, so that
+                # only the cache can restore it.
+                for item in seed.Items:
+                    item.applied_items = []
+
+                cached = seed.Seed.Generate(tags, version, value)
+                if not cached.load_assignment():
+                    failures.append(f"{cached.string} was not cached")
+                elif _assignment(cached) != expected:
+                    failures.append(f"{cached.string} differs when cached")
+
+    digest = seed._tables_digest
+    seed._tables_digest = "changed"
+    if cached.load_assignment():
+        failures.append("Cache was not invalidated by a table change")
+    seed._tables_digest = digest
+
+    return failures
+
+
+class AssignmentCacheTest(unittest.TestCase):
+    def check(self, game: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            failures = pool.apply(_compare, (game,))
+        self.assertEqual(failures, [])
+
+    def test_bl2(self) -> None:
+        self.check("bl2")
+
+    def test_tps(self) -> None:
+        self.check("tps")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Checks what each online tracker backend publishes, against the stand-in
+server or a temporary directory, and that unchanged files are never sent
+again. Runs headlessly in a fresh process for each backend, as the mod's
+options and upload state are module globals.
+"""
+
+from __future__ import annotations
+
+import multiprocessing, os, sys, tempfile, unittest
+
+from typing import Dict, List
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "LootRandomizer",
+    ),
+)
+
+import headless
+
+
+def _publish(backend: str) -> List[str]:
+    """
+    Publish a tracker, then the same tracker again, then one with a single
+    changed section, and finally another seed's tracker, through the given
+    backend, returning a description of each way the published files or the
+    requests sent were not as expected.
+    """
+    headless.prepare("bl2")
+    from Mods.LootRandomizer.Mod import github, options
+    from standin import StandInServer
+
+    server = StandInServer()
+    server.start()
+
+    directory = tempfile.mkdtemp()
+    github.outbox_dir = os.path.join(tempfile.mkdtemp(), "Outbox")
+    github.GithubGistApi = f"{server.url}/gists"
+    github._uploader.min_interval = 0
+    options.SaveSettings = lambda: None
+    options.OnlineTrackerBackend.CurrentValue = backend
+    options.GithubToken.CurrentValue = "stand-in"
+    options.UploadedDigests.CurrentValue = dict()
+    options.GistId.CurrentValue = ""
+    options.LastSeed.CurrentValue = ""
+    if backend == "Directory":
+        options.TrackerDestination.CurrentValue = directory
+    else:
+        options.TrackerDestination.CurrentValue = f"{server.url}/tracker"
+
+    def published() -> Dict[str, str]:
+        if backend == "Github Gist":
+            return dict(server.gists.get(options.GistId.CurrentValue, {}))
+        if backend == "Directory":
+            contents = dict()
+            for file_name in os.listdir(directory):
+                path = os.path.join(directory, file_name)
+                with open(path, "r", encoding="utf-8") as file:
+                    contents[file_name[:-4]] = file.read()
+            return contents
+        return dict(server.hooks.get("/tracker", {}).get("files", {}))
+
+    def modified() -> Dict[str, int]:
+        return {
+            file_name: os.stat(os.path.join(directory, file_name)).st_mtime_ns
+            for file_name in os.listdir(directory)
+        }
+
+    def update(seed: str, sections: List[str]) -> int:
+        """Publish the tracker, returning the requests it took."""
+        requests = server.requests
+        github.update(
+            seed,
+            f"Loot Randomizer Seed {seed}\n",
+            [
+                (f"Section {index}", text)
+                for index, text in enumerate(sections)
+            ],
+        )
+        github._uploader.flush()
+        return server.requests - requests
+
+    seed = "abcde-fghij-klmno"
+    files = {
+        seed: f"Loot Randomizer Seed {seed}\n",
+        f"{seed} 01 Section 0": "Enemy: Boom\n",
+        f"{seed} 02 Section 1": "Enemy: Bewm\n",
+    }
+    network = 0 if backend == "Directory" else 1
+    failures: List[str] = []
+
+    sent = update(seed, ["Enemy: Boom\n", "Enemy: Bewm\n"])
+    if sent != network:
+        failures.append(f"First upload sent {sent} requests")
+    if published() != files:
+        failures.append(f"First upload published {published()}")
+
+    if backend == "Directory":
+        for file_name in os.listdir(directory):
+            os.utime(os.path.join(directory, file_name), ns=(0, 0))
+    unchanged = modified() if backend == "Directory" else dict()
+
+    sent = update(seed, ["Enemy: Boom\n", "Enemy: Bewm\n"])
+    if sent:
+        failures.append(f"Unchanged upload sent {sent} requests")
+    if backend == "Directory" and modified() != unchanged:
+        failures.append("Unchanged upload rewrote files")
+
+    files[f"{seed} 02 Section 1"] = "Enemy: Bewm - Nothing\n"
+    sent = update(seed, ["Enemy: Boom\n", "Enemy: Bewm - Nothing\n"])
+    if sent != network:
+        failures.append(f"Changed upload sent {sent} requests")
+    if published() != files:
+        failures.append(f"Changed upload published {published()}")
+
+    if backend == "Github Gist":
+        sent_files = set(server.last_body["files"])
+        if sent_files != {f"{seed} 02 Section 1"}:
+            failures.append(f"Changed upload sent {sorted(sent_files)}")
+    elif backend == "Directory":
+        rewritten = {
+            file_name
+            for file_name, mtime in modified().items()
+            if mtime != unchanged.get(file_name)
+        }
+        if rewritten != {f"{seed} 02 Section 1.txt"}:
+            failures.append(f"Changed upload rewrote {sorted(rewritten)}")
+    elif server.last_body != {"seed": seed, "files": files}:
+        failures.append(f"Webhook was sent {server.last_body}")
+
+    # A new seed's files replace the last one's, other than in a directory.
+    other = "pqrst-uvwxy-zabcd"
+    update(other, ["Enemy: Boom\n"])
+    other_files = {
+        other: f"Loot Randomizer Seed {other}\n",
+        f"{other} 01 Section 0": "Enemy: Boom\n",
+    }
+    expected = other_files
+    if backend == "Directory":
+        expected = {**files, **other_files}
+    if published() != expected:
+        failures.append(f"New seed published {published()}")
+
+    github.Close()
+    server.shutdown()
+    server.server_close()
+    return failures
+
+
+class BackendTest(unittest.TestCase):
+    def check(self, backend: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            failures = pool.apply(_publish, (backend,))
+        self.assertEqual(failures, [])
+
+    def test_gist(self) -> None:
+        self.check("Github Gist")
+
+    def test_webhook(self) -> None:
+        self.check("Webhook PUT")
+
+    def test_directory(self) -> None:
+        self.check("Directory")
+
+
+if __name__ == "__main__":
+    unittest.main()
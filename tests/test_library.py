@@ -0,0 +1,77 @@
+"""
+Checks that the tracker index counts logged duds as found, as the in-game
+tracker does. Runs headlessly in a fresh process, as the mod's tables are
+chosen at import time.
+"""
+
+from __future__ import annotations
+
+import multiprocessing, os, sys, tempfile, unittest
+
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "LootRandomizer",
+    ),
+)
+
+import headless
+
+
+def _index(
+    game: str,
+) -> Tuple[str, Dict[str, Any], Dict[str, float], List[str]]:
+    """
+    Index a tracker with a dud and an item logged, returning the dud's
+    location and the indexed locations, along with the completion and the
+    unfinished seeds the index reports.
+    """
+    headless.prepare(game)
+    from Mods.LootRandomizer.Mod import items, library
+
+    library.seeds_dir = tempfile.mkdtemp()
+    library.index_path = os.path.join(library.seeds_dir, "Index.json")
+
+    dud, found = sorted(library._location_names)[:2]
+    item = sorted(item.name for item in library.Items)[0]
+    with open(
+        os.path.join(library.seeds_dir, "abcde-fghij.txt"),
+        "w",
+        encoding="utf-8",
+    ) as file:
+        file.write(
+            "Loot Randomizer Seed abcde-fghij\n\n"
+            f"{dud} - {items.DudItem.name}\n"
+            f"{found} - {item}\n"
+        )
+
+    library.Refresh()
+    (entry,) = library.Trackers()
+    return dud, entry.locations, library.Completion(), library.Unfinished()
+
+
+class TrackerIndexTest(unittest.TestCase):
+    def check(self, game: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            dud, locations, completion, unfinished = pool.apply(
+                _index, (game,)
+            )
+
+        self.assertEqual(locations[dud], (2, "Nothing"))
+        self.assertTrue(all(state == 2 for state, _ in locations.values()))
+        self.assertEqual(completion, {"abcde-fghij": 1.0})
+        self.assertEqual(unfinished, [])
+
+    def test_bl2(self) -> None:
+        self.check("bl2")
+
+    def test_tps(self) -> None:
+        self.check("tps")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Checks that online tracker uploads failing against the stand-in server are
+kept in the outbox until they are published, within the uploader's bound on
+pending uploads, and that the outbox is resubmitted by a later session.
+Runs headlessly in a fresh process for each failure mode, as the mod's
+tables are chosen at import time.
+"""
+
+from __future__ import annotations
+
+import json, multiprocessing, os, sys, tempfile, time, unittest
+
+from typing import Callable, Dict, List
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "LootRandomizer",
+    ),
+)
+
+import headless
+
+
+def _wait(condition: Callable[[], bool], timeout: float = 10) -> bool:
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _outbox(failure: str) -> List[str]:
+    """
+    Publish through the webhook backend to a stand-in failing every request
+    in the given way, then let it recover, returning a description of each
+    way the outbox misbehaved.
+    """
+    headless.prepare("bl2")
+    from Mods.LootRandomizer.Mod import github, options, tracker
+    from standin import StandInServer
+
+    server = StandInServer()
+    server.failures = 2**30
+    server.failure = failure
+    server.start()
+
+    github.outbox_dir = os.path.join(tempfile.mkdtemp(), "Outbox")
+    options.SaveSettings = lambda: None
+    options.OnlineTracker.CurrentValue = True
+    options.OnlineTrackerBackend.CurrentValue = "Webhook PUT"
+    options.TrackerDestination.CurrentValue = f"{server.url}/tracker"
+    options.UploadedDigests.CurrentValue = dict()
+
+    uploader = github._uploader
+    uploader.min_interval = 0
+    # Keep a failed upload waiting, so that others queue up behind it.
+    uploader.base_backoff = uploader.max_backoff = 60
+
+    def outboxed() -> Dict[str, Dict[str, str]]:
+        tracker.Flush()
+        if not os.path.isdir(github.outbox_dir):
+            return dict()
+        contents = dict()
+        for file_name in os.listdir(github.outbox_dir):
+            path = os.path.join(github.outbox_dir, file_name)
+            with open(path, "r", encoding="utf-8") as file:
+                contents[file_name[:-5]] = json.load(file)
+        return contents
+
+    def files(seed: str) -> Dict[str, str]:
+        return {seed: f"Loot Randomizer Seed {seed}\n"}
+
+    failures: List[str] = []
+    max_pending = uploader.max_pending
+    seeds = [f"seed-{index:02}" for index in range(max_pending + 2)]
+
+    github.update(seeds[0], files(seeds[0])[seeds[0]], [])
+    if not _wait(lambda: seeds[0] in outboxed()):
+        failures.append("Failed upload was not saved to the outbox")
+    elif outboxed()[seeds[0]] != files(seeds[0]):
+        failures.append("Outbox does not hold the failed upload's files")
+
+    # Queue more seeds than the bound while the first waits to retry, so
+    # that the stalest are dropped along with their outbox slots.
+    for seed in seeds[1:]:
+        github.update(seed, files(seed)[seed], [])
+    if list(uploader._pending) != seeds[2:]:
+        failures.append(f"Pending uploads were {list(uploader._pending)}")
+    if seeds[0] in outboxed():
+        failures.append("Dropped upload was left in the outbox")
+
+    # A retry due while the queue is full keeps its outbox slot.
+    with uploader._condition:
+        for seed in seeds[2:]:
+            del uploader._pending[seed]
+        github.update(seeds[0], files(seeds[0])[seeds[0]], [])
+        github.update(seeds[1], files(seeds[1])[seeds[1]], [])
+        uploader.max_pending = 1
+        uploader.next_send_time = 0
+    requests = server.requests
+    if not _wait(
+        lambda: server.requests > requests and uploader._current is None
+    ):
+        failures.append("Uploader did not retry")
+    elif seeds[0] not in outboxed():
+        failures.append("Retry dropped by a full queue left the outbox")
+    uploader.max_pending = max_pending
+
+    # Disabling saves everything pending, which a later session drains.
+    github.SaveOutbox()
+    saved = outboxed()
+    if sorted(saved) != seeds[:2]:
+        failures.append(f"Outbox held {sorted(saved)} when disabled")
+
+    with uploader._condition:
+        uploader._pending.clear()
+    github._uploader = uploader = github._Uploader()
+    github._outboxed.clear()
+    uploader.min_interval = 0
+
+    # Leave more in the outbox than the bound, the rest being staler.
+    for index, seed in enumerate(seeds[2:]):
+        path = github._OutboxPath(seed)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(files(seed), file)
+        stale = time.time() - 100 + index
+        os.utime(path, (stale, stale))
+
+    server.failures = 0
+    requests = server.requests
+    github.DrainOutbox()
+    uploader.flush()
+    if outboxed():
+        failures.append(f"Outbox held {sorted(outboxed())} once published")
+    if server.requests - requests != max_pending:
+        failures.append(
+            f"Drained outbox sent {server.requests - requests} requests"
+        )
+    published = server.hooks.get("/tracker", {}).get("seed")
+    if published not in seeds[:2]:
+        failures.append(f"Drained outbox published {published} last")
+
+    server.shutdown()
+    server.server_close()
+    return failures
+
+
+class OutboxTest(unittest.TestCase):
+    def check(self, failure: str) -> None:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            failures = pool.apply(_outbox, (failure,))
+        self.assertEqual(failures, [])
+
+    def test_error(self) -> None:
+        self.check("error")
+
+    def test_drop(self) -> None:
+        self.check("drop")
+
+
+if __name__ == "__main__":
+    unittest.main()